@@ -47,8 +47,28 @@ import logging
 from typing import Optional, Dict, Any, Tuple
 from functools import wraps
 
+# orjson parses large API payloads (eBay/Etsy item lists) several times faster
+# than the stdlib json behind Response.json(); optional.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Longest server-requested Retry-After we'll sleep for before a retry
+MAX_RETRY_AFTER = 5.0
+
+
+def _parse_json(r: requests.Response) -> Any:
+    """Response body as JSON, via orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(r.content)
+        except orjson.JSONDecodeError:
+            pass  # Not UTF-8 JSON; let requests detect the encoding and raise as before
+    return r.json()
+
 
 class APIClient:
     """
@@ -101,6 +121,18 @@ class APIClient:
         self.retry_on_status = retry_on_status
         self.session = requests.Session()
 
+    def _status_retry_wait(self, r: requests.Response, attempt: int) -> float:
+        """
+        Backoff before retrying a retryable status. Honors a numeric
+        Retry-After (429/503) when it asks for longer, capped at
+        MAX_RETRY_AFTER so one throttled retailer can't stall the search.
+        """
+        wait = self.backoff_factor * (2 ** attempt)
+        retry_after = r.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            wait = max(wait, min(float(retry_after), MAX_RETRY_AFTER))
+        return wait
+
     def get(
         self,
         url: str,
@@ -143,7 +175,7 @@ class APIClient:
 
                 # Retry on specific status codes
                 if r.status_code in self.retry_on_status and attempt < self.max_retries:
-                    wait = self.backoff_factor * (2 ** attempt)
+                    wait = self._status_retry_wait(r, attempt)
                     logger.warning(
                         f"HTTP {r.status_code} from {url[:60]}, "
                         f"retrying in {wait:.1f}s (attempt {attempt + 1}/{self.max_retries})"
@@ -155,7 +187,7 @@ class APIClient:
                 r.raise_for_status()
 
                 # Success - parse and return
-                return r.json() if parse_json else r.text
+                return _parse_json(r) if parse_json else r.text
 
             except requests.RequestException as e:
                 if attempt < self.max_retries:
@@ -224,7 +256,7 @@ class APIClient:
 
                 # Retry on specific status codes
                 if r.status_code in self.retry_on_status and attempt < self.max_retries:
-                    wait = self.backoff_factor * (2 ** attempt)
+                    wait = self._status_retry_wait(r, attempt)
                     logger.warning(
                         f"HTTP {r.status_code} from {url[:60]}, "
                         f"retrying in {wait:.1f}s (attempt {attempt + 1}/{self.max_retries})"
@@ -236,7 +268,7 @@ class APIClient:
                 r.raise_for_status()
 
                 # Success - parse and return
-                return r.json() if parse_json else r.text
+                return _parse_json(r) if parse_json else r.text
 
             except requests.RequestException as e:
                 if attempt < self.max_retries:
@@ -69,6 +69,21 @@ from typing import Dict, List, Optional, Tuple
 
 import requests
 
+from product_schema import fallback_product_id
+
+# orjson is several times faster than the stdlib for the per-row interest_tags
+# round trips; optional so the module still works where it isn't installed.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -345,7 +360,7 @@ def _row_to_db_product(row: Dict, advertiser_info: Dict) -> Optional[Dict]:
     product_id = _ci_get(row,
         "aw_product_id", "merchant_product_id", "product_id", "Product ID")
     if not product_id:
-        product_id = str(abs(hash(title + link)))[:16]
+        product_id = fallback_product_id(title, link)
 
     # Retailer = merchant name (consistent with CJ sync pattern)
     retailer = advertiser_info.get('advertiser_name', 'Awin')
@@ -413,8 +428,8 @@ def _upsert_awin_product(
     existing_tags: List[str] = []
     if existing_row and existing_row[0]:
         try:
-            existing_tags = json.loads(existing_row[0])
-        except (json.JSONDecodeError, TypeError):
+            existing_tags = _json_loads(existing_row[0])
+        except (ValueError, TypeError):
             pass
 
     # Merge: new tags first, then existing (deduplication via dict.fromkeys)
@@ -449,7 +464,7 @@ def _upsert_awin_product(
         product.get('image_url', ''),
         product['affiliate_link'],
         product.get('brand', ''),
-        json.dumps(merged_tags),
+        _json_dumps(merged_tags),
         now,
         now,
         gift_score,
@@ -727,11 +742,13 @@ def run_awin_sync(dry_run: bool = False) -> Dict:
         status = (f.get('membership_status') or '').lower()
         if status not in _active_statuses:
             return False
-        text = ' '.join([
-            (f.get('feed_name') or '').lower(),
-            (f.get('advertiser_name') or '').lower(),
-            (f.get('vertical') or '').lower(),
-        ])
+        text = f.get('_text_lower')
+        if text is None:
+            text = ' '.join([
+                (f.get('feed_name') or '').lower(),
+                (f.get('advertiser_name') or '').lower(),
+                (f.get('vertical') or '').lower(),
+            ])
         if any(k in text for k in _adult_kw):
             return False
         if 'closed' in text:
@@ -931,9 +948,9 @@ def get_cached_awin_products_for_interest(
             min_gift_score,
             limit,
         ))
-        rows = [dict(r) for r in cur.fetchall()]
+        products = [_db_row_to_awin_format(dict(r), interest) for r in cur]
         conn.close()
-        return [_db_row_to_awin_format(r, interest) for r in rows]
+        return products
     except Exception as e:
         logger.error("Awin cache lookup failed for '%s': %s", interest, e)
         return []
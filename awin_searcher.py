@@ -20,6 +20,7 @@ import zlib
 import requests
 
 from api_client import APIClient
+from product_schema import fallback_product_id
 
 logger = logging.getLogger(__name__)
 
@@ -317,6 +318,42 @@ _TAYST_COFFEE_ALL_PRODUCTS = [
 ]
 
 
+def _trigger_re(triggers):
+    """Compile a trigger-word set into one alternation regex (substring semantics)."""
+    return re.compile("|".join(re.escape(t) for t in sorted(triggers, key=len, reverse=True)))
+
+
+# Static partner triggers, compiled once at import. Each entry is scanned
+# against the joined interest text with a single regex search instead of one
+# substring test per trigger word per call.
+_AWIN_STATIC_PARTNERS = [
+    # VitaJuwel — trigger on wellness/crystal/yoga/meditation/spiritual themes
+    (_trigger_re({"crystal", "crystals", "yoga", "wellness", "meditation", "spiritual", "gemstone", "self-care", "selfcare", "mindful", "mindfulness", "holistic", "reiki", "chakra"}),
+     _VITAJUWEL_ALL_PRODUCTS),
+    # VSGO — trigger on photography/camera themes
+    (_trigger_re({"photo", "photography", "camera", "cameras", "photographer", "canon", "nikon", "sony", "mirrorless", "dslr", "content creator", "content creation", "videograph"}),
+     _VSGO_ALL_PRODUCTS),
+    # Gourmet Gift Basket Store — trigger on food/gourmet/chocolate/hostess themes
+    (_trigger_re({"food", "foodie", "gourmet", "chocolate", "cheese", "snack", "baking", "cooking", "chef", "brunch", "hostess", "housewarming", "wine", "charcuterie", "treats", "gift basket", "spa", "relaxation", "self-care", "pampering"}),
+     _GOURMET_GIFT_BASKET_ALL_PRODUCTS),
+    # Goldia — trigger on jewelry/fashion accessories themes
+    (_trigger_re({"jewelry", "jewellery", "necklace", "bracelet", "earring", "earrings", "ring", "gold", "silver", "diamond", "pendant", "charm", "accessories", "fashion", "elegant", "luxury", "bling", "gems", "gemstone"}),
+     _GOLDIA_ALL_PRODUCTS),
+    # OUTFITR — trigger on cycling/biking/outdoor vehicle themes
+    (_trigger_re({"cycling", "biking", "bike", "bicycle", "cyclist", "road trip", "rv", "camping", "e-bike", "ebike", "mountain bike", "trail"}),
+     _OUTFITR_ALL_PRODUCTS),
+    # Young Electric Bikes — trigger on cycling/e-bike/outdoor adventure themes
+    (_trigger_re({"cycling", "biking", "bike", "bicycle", "cyclist", "e-bike", "ebike",
+                  "electric bike", "mountain bike", "trail", "outdoor adventure", "commuting"}),
+     _YOUNG_ELECTRIC_BIKES_ALL_PRODUCTS),
+    # Tayst Coffee — trigger on coffee/sustainability/eco-friendly/subscription themes
+    (_trigger_re({"coffee", "espresso", "cappuccino", "latte", "morning routine", "sustainability",
+                  "sustainable", "eco", "eco-friendly", "environment", "environmentalist",
+                  "zero waste", "compost", "subscription box"}),
+     _TAYST_COFFEE_ALL_PRODUCTS),
+]
+
+
 def _get_awin_static_products(profile):
     """Return static Awin products relevant to the current profile's interests.
 
@@ -328,44 +365,9 @@ def _get_awin_static_products(profile):
     interest_text = " ".join(interests)
 
     results = []
-
-    # VitaJuwel — trigger on wellness/crystal/yoga/meditation/spiritual themes
-    vitajuwel_triggers = {"crystal", "crystals", "yoga", "wellness", "meditation", "spiritual", "gemstone", "self-care", "selfcare", "mindful", "mindfulness", "holistic", "reiki", "chakra"}
-    if any(t in interest_text for t in vitajuwel_triggers):
-        results.extend(_VITAJUWEL_ALL_PRODUCTS)
-
-    # VSGO — trigger on photography/camera themes
-    vsgo_triggers = {"photo", "photography", "camera", "cameras", "photographer", "canon", "nikon", "sony", "mirrorless", "dslr", "content creator", "content creation", "videograph"}
-    if any(t in interest_text for t in vsgo_triggers):
-        results.extend(_VSGO_ALL_PRODUCTS)
-
-    # Gourmet Gift Basket Store — trigger on food/gourmet/chocolate/hostess themes
-    gourmet_triggers = {"food", "foodie", "gourmet", "chocolate", "cheese", "snack", "baking", "cooking", "chef", "brunch", "hostess", "housewarming", "wine", "charcuterie", "treats", "gift basket", "spa", "relaxation", "self-care", "pampering"}
-    if any(t in interest_text for t in gourmet_triggers):
-        results.extend(_GOURMET_GIFT_BASKET_ALL_PRODUCTS)
-
-    # Goldia — trigger on jewelry/fashion accessories themes
-    goldia_triggers = {"jewelry", "jewellery", "necklace", "bracelet", "earring", "earrings", "ring", "gold", "silver", "diamond", "pendant", "charm", "accessories", "fashion", "elegant", "luxury", "bling", "gems", "gemstone"}
-    if any(t in interest_text for t in goldia_triggers):
-        results.extend(_GOLDIA_ALL_PRODUCTS)
-
-    # OUTFITR — trigger on cycling/biking/outdoor vehicle themes
-    outfitr_triggers = {"cycling", "biking", "bike", "bicycle", "cyclist", "road trip", "rv", "camping", "e-bike", "ebike", "mountain bike", "trail"}
-    if any(t in interest_text for t in outfitr_triggers):
-        results.extend(_OUTFITR_ALL_PRODUCTS)
-
-    # Young Electric Bikes — trigger on cycling/e-bike/outdoor adventure themes
-    young_electric_triggers = {"cycling", "biking", "bike", "bicycle", "cyclist", "e-bike", "ebike",
-                                "electric bike", "mountain bike", "trail", "outdoor adventure", "commuting"}
-    if any(t in interest_text for t in young_electric_triggers):
-        results.extend(_YOUNG_ELECTRIC_BIKES_ALL_PRODUCTS)
-
-    # Tayst Coffee — trigger on coffee/sustainability/eco-friendly/subscription themes
-    tayst_triggers = {"coffee", "espresso", "cappuccino", "latte", "morning routine", "sustainability",
-                      "sustainable", "eco", "eco-friendly", "environment", "environmentalist",
-                      "zero waste", "compost", "subscription box"}
-    if any(t in interest_text for t in tayst_triggers):
-        results.extend(_TAYST_COFFEE_ALL_PRODUCTS)
+    for trigger_re, products in _AWIN_STATIC_PARTNERS:
+        if trigger_re.search(interest_text):
+            results.extend(products)
 
     return results
 
@@ -419,6 +421,11 @@ def _get_feed_list(api_key):
 
     # Normalize column names (could be with/without spaces); include Vertical and Feed Name for relevance
     out = []
+    # The list can repeat a feed (language/region variants of one advertiser
+    # row); keep the first entry per feed_id (or URL minus query) so callers
+    # never download the same CSV twice.
+    seen_feed_keys = set()
+    duplicates = 0
     for row in rows:
         # Case-insensitive column lookup helper
         ci = {k.lower().strip(): v for k, v in row.items()}
@@ -443,6 +450,11 @@ def _get_feed_list(api_key):
         language = (ci.get("language") or "").strip()
         primary_region = (ci.get("primary region") or ci.get("primary_region") or "").strip()
         if url_val:
+            feed_key = feed_id or url_val.split("?", 1)[0]
+            if feed_key in seen_feed_keys:
+                duplicates += 1
+                continue
+            seen_feed_keys.add(feed_key)
             out.append({
                 "url": url_val,
                 "feed_id": feed_id,
@@ -453,6 +465,9 @@ def _get_feed_list(api_key):
                 "num_products": num_products,
                 "language": language or primary_region,
                 "primary_region": primary_region,
+                # Lowercased once here (list is cached for AWIN_CACHE_TTL) so
+                # per-feed relevance filters don't re-lower three fields per check
+                "_text_lower": " ".join([feed_name.lower(), advertiser.lower(), vertical.lower()]),
             })
     _awin_feed_list_cache[api_key] = out
     _awin_feed_list_ts = now
@@ -461,7 +476,8 @@ def _get_feed_list(api_key):
     for f in out:
         s = f.get("membership_status", "").lower() or "(empty)"
         status_counts[s] = status_counts.get(s, 0) + 1
-    logger.info("Awin feed list: %s feeds, status breakdown: %s", len(out), status_counts)
+    logger.info("Awin feed list: %s feeds (%s duplicates dropped), status breakdown: %s",
+                len(out), duplicates, status_counts)
     return out
 
 
@@ -471,6 +487,90 @@ MAX_ROWS_PER_FEED = 800
 MAX_ROWS_TO_SCAN_PER_FEED = 3500
 
 
+# Read size for buffered feed downloads. 128 KB reads amortize per-chunk
+# overhead better than the old 64 KB on multi-MB feeds.
+FEED_CHUNK_BYTES = 128 * 1024
+
+
+def _buffer_feed(r, max_bytes):
+    """Read up to max_bytes of a streamed feed response into memory, then close it.
+
+    Shared by every live-feed reader in place of a per-call TextIOWrapper on
+    r.raw; callers decode and parse the returned bytes themselves.
+    """
+    buf = bytearray()
+    for chunk in r.iter_content(chunk_size=FEED_CHUNK_BYTES):
+        buf += chunk
+        if len(buf) >= max_bytes:
+            break
+    r.close()
+    return bytes(buf)
+
+
+def _iter_candidate_rows(data, prepared_queries, stats, truncated=False):
+    """
+    Yield rows from the first MAX_ROWS_TO_SCAN_PER_FEED data rows of a feed
+    that could match any prepared query.
+
+    Most rows match nothing, so each raw line is first checked with a plain
+    bytes substring search for any meaningful query term; only lines that
+    pass are decoded and run through the csv module. stats["scanned"] counts
+    every data row read so far, skipped or not, for the caller's log line.
+
+    Candidate lines without any quote character are split directly on the
+    delimiter (the common case for Awin feeds); only quoted lines go through
+    csv.reader. The delimiter is sniffed once from the header line.
+
+    Falls back to parsing every row with csv.DictReader when the prefilter
+    can't be trusted: a quoted field spanning lines (odd quote count on a
+    line) or a non-ASCII term (bytes.lower() only folds ASCII).
+
+    Pass truncated=True when data was cut off at a byte limit; everything
+    after the last newline is then a partial record and is dropped.
+    """
+    if truncated:
+        data = data[:data.rfind(b"\n") + 1]
+    needles = set()
+    for _, terms in prepared_queries:
+        needles.update(terms)
+    lines = data.split(b"\n")
+    header_line = lines[0].decode("utf-8", errors="replace").rstrip("\r")
+    delimiter = max((",", "|", "\t"), key=header_line.count)
+    head = lines[:MAX_ROWS_TO_SCAN_PER_FEED + 1]
+    if (not all(n.isascii() for n in needles)
+            or any(line.count(b'"') % 2 for line in head)):
+        text = data.decode("utf-8", errors="replace")
+        reader = csv.DictReader(io.StringIO(text, newline=""), delimiter=delimiter)
+        for row_number, row in enumerate(reader, 1):
+            if row_number > MAX_ROWS_TO_SCAN_PER_FEED:
+                break
+            stats["scanned"] = row_number
+            yield row
+        return
+
+    needle_bytes = [n.encode("ascii") for n in needles]
+    header = next(csv.reader([header_line], delimiter=delimiter), [])
+    if not header:
+        return
+    row_number = 0
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        row_number += 1
+        if row_number > MAX_ROWS_TO_SCAN_PER_FEED:
+            break
+        stats["scanned"] = row_number
+        line_lower = line.lower()
+        if not any(n in line_lower for n in needle_bytes):
+            continue
+        text = line.decode("utf-8", errors="replace").rstrip("\r")
+        if b'"' in line:
+            fields = next(csv.reader([text], delimiter=delimiter), [])
+        else:
+            fields = text.split(delimiter)
+        yield dict(zip(header, fields))
+
+
 def _stream_feed_and_match(feed_url, search_queries, max_results_from_feed, seen_ids):
     """
     Download a feed CSV (buffered, not raw-stream) and yield rows that match any search query.
@@ -492,15 +592,7 @@ def _stream_feed_and_match(feed_url, search_queries, max_results_from_feed, seen
 
     # Buffer first BUFFER_BYTES so we aren't at the mercy of the socket staying open
     try:
-        chunks = []
-        total = 0
-        for chunk in r.iter_content(chunk_size=64 * 1024):
-            chunks.append(chunk)
-            total += len(chunk)
-            if total >= BUFFER_BYTES:
-                break
-        r.close()
-        data = b"".join(chunks)
+        data = _buffer_feed(r, BUFFER_BYTES)
     except Exception as e:
         logger.warning("Awin feed download failed: %s", e)
         try:
@@ -511,51 +603,38 @@ def _stream_feed_and_match(feed_url, search_queries, max_results_from_feed, seen
 
     if not data:
         return
+    truncated = len(data) >= BUFFER_BYTES
 
     # Awin feeds often return gzip-compressed data without Content-Encoding header
     data = _decompress_if_gzipped(data)
 
+    prepared = _prepare_queries(search_queries)
     count = 0
-    scanned = 0
+    stats = {"scanned": 0}
+    logged_sample = False
     try:
-        text = data.decode("utf-8", errors="replace")
-        reader = csv.DictReader(io.StringIO(text, newline=""))
-        for row in reader:
-            scanned += 1
-            # Log column names from first row for debugging
-            if scanned == 1:
+        for row in _iter_candidate_rows(data, prepared, stats, truncated=truncated):
+            # Log column names from first parsed row for debugging
+            if not logged_sample:
+                logged_sample = True
                 logger.info("Awin feed CSV columns: %s", list(row.keys())[:20])
                 # Log a sample product to see what data we're working with
                 sample_title = _ci_get(row, "product_name", "title", "product_title", "name")
                 sample_link = _ci_get(row, "aw_deep_link", "merchant_deep_link", "deep_link", "link", "aw_product_url")
                 logger.info("Awin feed sample row: title=%s link=%s",
                             (sample_title or "(none)")[:60], (sample_link or "(none)")[:60])
-            if count >= max_results_from_feed or scanned > MAX_ROWS_TO_SCAN_PER_FEED:
-                break
-            for q in search_queries:
-                if count >= max_results_from_feed:
-                    break
-                terms = list(re.split(r"\s+", q["query"]))
-                if q.get("primary_term") and q["primary_term"] not in (t.lower() for t in terms):
-                    terms.append(q["primary_term"])
-                if not _matches_query(row, terms):
-                    continue
-                product = _row_to_product(
-                    row,
-                    q.get("interest", "general"),
-                    q.get("query", "gift"),
-                    q.get("priority", "medium"),
-                )
-                if not product or product["product_id"] in seen_ids:
-                    continue
-                seen_ids.add(product["product_id"])
-                count += 1
-                yield product
+            if count >= max_results_from_feed:
                 break
+            product = _try_row(row, prepared)
+            if not product or product["product_id"] in seen_ids:
+                continue
+            seen_ids.add(product["product_id"])
+            count += 1
+            yield product
     except Exception as e:
         logger.warning("Awin feed parse failed (buffered): %s", e)
-    if scanned > 0:
-        logger.info("Awin buffered: scanned %s rows, matched %s from %s", scanned, count, feed_url[:80])
+    if stats["scanned"] > 0:
+        logger.info("Awin buffered: scanned %s rows, matched %s from %s", stats["scanned"], count, feed_url[:80])
 
 
 def _fetch_feed_nonstream(feed_url, search_queries, max_results_from_feed, seen_ids):
@@ -571,39 +650,23 @@ def _fetch_feed_nonstream(feed_url, search_queries, max_results_from_feed, seen_
         return
     # Decompress if gzipped (Awin feeds often lack Content-Encoding header)
     raw_data = _decompress_if_gzipped(r.content)
-    text = raw_data.decode("utf-8", errors="replace")
+    prepared = _prepare_queries(search_queries)
     count = 0
-    scanned = 0
+    stats = {"scanned": 0}
     try:
-        reader = csv.DictReader(io.StringIO(text, newline=""))
-        for row in reader:
-            scanned += 1
-            if count >= max_results_from_feed or scanned > MAX_ROWS_TO_SCAN_PER_FEED:
-                break
-            for q in search_queries:
-                if count >= max_results_from_feed:
-                    break
-                terms = list(re.split(r"\s+", q["query"]))
-                if q.get("primary_term") and q["primary_term"] not in (t.lower() for t in terms):
-                    terms.append(q["primary_term"])
-                if not _matches_query(row, terms):
-                    continue
-                product = _row_to_product(
-                    row,
-                    q.get("interest", "general"),
-                    q.get("query", "gift"),
-                    q.get("priority", "medium"),
-                )
-                if not product or product["product_id"] in seen_ids:
-                    continue
-                seen_ids.add(product["product_id"])
-                count += 1
-                yield product
+        for row in _iter_candidate_rows(raw_data, prepared, stats):
+            if count >= max_results_from_feed:
                 break
+            product = _try_row(row, prepared)
+            if not product or product["product_id"] in seen_ids:
+                continue
+            seen_ids.add(product["product_id"])
+            count += 1
+            yield product
     except Exception as e:
         logger.warning("Awin feed non-stream parse failed: %s", e)
-    if scanned > 0:
-        logger.debug("Awin non-stream: scanned %s rows, matched %s", scanned, count)
+    if stats["scanned"] > 0:
+        logger.debug("Awin non-stream: scanned %s rows, matched %s", stats["scanned"], count)
 
 
 def _stream_feed_first_n(feed_url, n, seen_ids):
@@ -619,15 +682,7 @@ def _stream_feed_first_n(feed_url, n, seen_ids):
     r.raw.decode_content = True
 
     try:
-        chunks = []
-        total = 0
-        for chunk in r.iter_content(chunk_size=64 * 1024):
-            chunks.append(chunk)
-            total += len(chunk)
-            if total >= BUFFER_BYTES:
-                break
-        r.close()
-        data = b"".join(chunks)
+        data = _buffer_feed(r, BUFFER_BYTES)
     except Exception as e:
         logger.warning("Awin feed download failed (first_n): %s", e)
         try:
@@ -671,15 +726,7 @@ def _download_feed_csv(feed_url):
     r.raw.decode_content = True
 
     try:
-        chunks = []
-        total = 0
-        for chunk in r.iter_content(chunk_size=64 * 1024):
-            chunks.append(chunk)
-            total += len(chunk)
-            if total >= BUFFER_BYTES:
-                break
-        r.close()
-        data = b"".join(chunks)
+        data = _buffer_feed(r, BUFFER_BYTES)
     except Exception as e:
         logger.warning("Awin feed download read failed: %s", e)
         try:
@@ -742,7 +789,7 @@ def _row_to_product(row, interest, query, priority):
     else:
         source_domain = "awin.com"
     product_id = _ci_get(row, "aw_product_id", "merchant_product_id", "product_id",
-                         "Product ID") or str(hash(title + link))[:16]
+                         "Product ID") or fallback_product_id(title, link)
     return {
         "title": title[:200],
         "link": link,
@@ -770,6 +817,27 @@ def _product_text(row):
     return name + " " + keywords + " " + brand
 
 
+_GENERIC_QUERY_TERMS = {"and", "the", "or", "with", "from", "gift", "present", "idea", "unique", "personalized", "accessories", "lover", "fan"}
+
+
+def _meaningful_terms(query_terms):
+    """Lowercased query terms minus single letters and generic gift words."""
+    meaningful_terms = []
+    for term in query_terms:
+        t = (term or "").strip().lower()
+        if len(t) <= 1 or t in _GENERIC_QUERY_TERMS:
+            continue
+        meaningful_terms.append(t)
+    return meaningful_terms
+
+
+def _text_matches(text, meaningful_terms):
+    """Apply the _matches_query threshold to already-extracted product text."""
+    matched = sum(1 for t in meaningful_terms if t in text)
+    threshold = 2 if len(meaningful_terms) >= 3 else 1
+    return matched >= threshold
+
+
 def _matches_query(row, query_terms):
     """True if product text contains enough meaningful query terms.
 
@@ -779,17 +847,37 @@ def _matches_query(row, query_terms):
     meaningful matches when the query has 3+ meaningful terms; 1 match is
     still fine for short queries (e.g. "hiking" or "Taylor Swift").
     """
+    return _text_matches(_product_text(row), _meaningful_terms(query_terms))
+
+
+def _prepare_queries(search_queries):
+    """Tokenize each search query once per feed instead of once per row."""
+    prepared = []
+    for q in search_queries:
+        terms = q["query"].split()
+        if q.get("primary_term") and q["primary_term"] not in (t.lower() for t in terms):
+            terms.append(q["primary_term"])
+        prepared.append((q, _meaningful_terms(terms)))
+    return prepared
+
+
+def _try_row(row, prepared_queries):
+    """Match one feed row against all queries and build its product on the first hit.
+
+    Fuses _matches_query and _row_to_product: the row's searchable text is
+    extracted once and shared by every query, and the product dict is only
+    built for a row that matches. Returns None when nothing matches.
+    """
     text = _product_text(row)
-    generic_terms = {"and", "the", "or", "with", "from", "gift", "present", "idea", "unique", "personalized", "accessories", "lover", "fan"}
-    meaningful_terms = []
-    for term in query_terms:
-        t = (term or "").strip().lower()
-        if len(t) <= 1 or t in generic_terms:
-            continue
-        meaningful_terms.append(t)
-    matched = sum(1 for t in meaningful_terms if t in text)
-    threshold = 2 if len(meaningful_terms) >= 3 else 1
-    return matched >= threshold
+    for q, meaningful_terms in prepared_queries:
+        if _text_matches(text, meaningful_terms):
+            return _row_to_product(
+                row,
+                q.get("interest", "general"),
+                q.get("query", "gift"),
+                q.get("priority", "medium"),
+            )
+    return None
 
 
 def search_products_awin(profile, data_feed_api_key, target_count=20, enhanced_search_terms=None):
@@ -24,9 +24,11 @@ API FEATURES:
 
 import os
 import logging
+import threading
 import time
 import urllib.parse
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
 # Optional catalog cache — eliminates live CJ API calls for recently-synced terms.
@@ -40,6 +42,14 @@ except ImportError:
     def get_cached_products_for_interest(*a, **kw): return []  # noqa: E704
 import json
 
+# orjson parses large product-search responses several times faster than the
+# stdlib; optional so the module still works where it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # CJ GraphQL API endpoint
@@ -2557,23 +2567,32 @@ class CJRateLimiter:
         self.max_requests = max_requests
         self.time_window = time_window
         self.requests = deque()
+        # Live term searches run on worker threads; serialize the bookkeeping
+        self._lock = threading.Lock()
 
     def wait_if_needed(self):
         """Wait if rate limit would be exceeded"""
-        now = time.time()
+        # Reserve a slot under the lock, then sleep outside it so other
+        # worker threads can take their own slots meanwhile
+        with self._lock:
+            now = time.time()
+
+            # Remove requests older than time window
+            while self.requests and self.requests[0] < now - self.time_window:
+                self.requests.popleft()
+
+            # If at limit, take the slot the oldest request frees up
+            slot = now
+            if len(self.requests) >= self.max_requests:
+                slot = self.requests.popleft() + self.time_window
 
-        # Remove requests older than time window
-        while self.requests and self.requests[0] < now - self.time_window:
-            self.requests.popleft()
+            self.requests.append(slot)
 
-        # If at limit, wait
-        if len(self.requests) >= self.max_requests:
-            sleep_time = self.requests[0] + self.time_window - now
+        sleep_time = slot - now
+        if sleep_time > 0:
             logger.info(f"CJ rate limit reached, sleeping {sleep_time:.1f}s")
             time.sleep(sleep_time)
 
-        self.requests.append(now)
-
 
 # Global rate limiter instance
 rate_limiter = CJRateLimiter()
@@ -2739,6 +2758,85 @@ def _parse_graphql_response(data, search_term):
     return products
 
 
+# Uncached terms are searched concurrently, one GraphQL request per term
+CJ_MAX_PARALLEL_SEARCHES = 5
+
+
+class _CJAuthError(Exception):
+    """CJ rejected the credentials (401/403); no other term will succeed."""
+
+
+def _search_cj_term(term, api_key, cid, pid, limit, joined_only, retry_on_429=True):
+    """
+    Run one live GraphQL products search for a single term.
+
+    Returns the parsed products ([] on a failed request). Raises _CJAuthError
+    on 401/403. A 429 backs off for 60s and retries the term once.
+    """
+    try:
+        # Rate limiting
+        rate_limiter.wait_if_needed()
+
+        # Build GraphQL query
+        query = _build_graphql_query(
+            keywords=[term],
+            company_id=cid,
+            publisher_id=pid,
+            limit=limit,
+            joined_only=joined_only
+        )
+
+        # Make GraphQL request
+        headers = _build_auth_headers(api_key)
+
+        logger.info(f"CJ GraphQL search: '{term}'")
+        response = requests.post(
+            CJ_GRAPHQL_ENDPOINT,
+            json={"query": query},
+            headers=headers,
+            timeout=30
+        )
+
+        # Handle errors
+        if response.status_code == 401:
+            logger.error("CJ authentication failed - check CJ_API_KEY")
+            raise _CJAuthError()
+        elif response.status_code == 403:
+            logger.warning("CJ 403 - not joined to any advertisers or access denied")
+            raise _CJAuthError()
+        elif response.status_code == 429:
+            if not retry_on_429:
+                logger.warning(f"CJ rate limit still exceeded - skipping '{term}'")
+                return []
+            logger.warning("CJ rate limit exceeded - waiting 60s...")
+            time.sleep(60)
+            return _search_cj_term(term, api_key, cid, pid, limit, joined_only, retry_on_429=False)
+        elif response.status_code != 200:
+            logger.error(f"CJ API error {response.status_code}: {response.text}")
+            return []
+
+        # Parse GraphQL response
+        data = _json_loads(response.content)
+
+        # Check for GraphQL errors
+        if 'errors' in data:
+            logger.error(f"CJ GraphQL errors: {data['errors']}")
+            return []
+
+        # Parse products
+        products = _parse_graphql_response(data, term)
+        logger.info(f"CJ search '{term}': found {len(products)} products")
+        return products
+
+    except _CJAuthError:
+        raise
+    except requests.RequestException as e:
+        logger.error(f"CJ API request failed for '{term}': {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error in CJ search for '{term}': {e}")
+    return []
+
+
 def search_products_cj(profile, api_key, company_id=None, publisher_id=None, target_count=20, enhanced_search_terms=None, joined_only=False):
     """
     Search CJ Affiliate for products matching user profile using GraphQL API
@@ -2816,9 +2914,14 @@ def search_products_cj(profile, api_key, company_id=None, publisher_id=None, tar
 
     all_products = []
 
+    # Serve what we can from the SQLite catalog first; everything else is
+    # searched live below.
+    live_terms = []
     for term in search_terms:
         if not term:
             continue
+        if len(all_products) >= target_count:
+            break
 
         # ----------------------------------------------------------------
         # Cache check — use SQLite catalog if this term was synced recently.
@@ -2836,77 +2939,33 @@ def search_products_cj(profile, api_key, company_id=None, publisher_id=None, tar
                         logger.info(
                             f"CJ catalog cache hit '{term}': {len(cached)} products"
                         )
-                        if len(all_products) >= target_count:
-                            break
                         continue
                     # Cache is fresh but empty for this term — fall through to live
             except Exception as _ce:
                 logger.debug(f"Cache lookup failed for '{term}': {_ce}")
         # ----------------------------------------------------------------
 
-        try:
-            # Rate limiting
-            rate_limiter.wait_if_needed()
-
-            # Build GraphQL query
-            query = _build_graphql_query(
-                keywords=[term],
-                company_id=cid,
-                publisher_id=pid,
-                limit=min(50, target_count),
-                joined_only=joined_only
-            )
-
-            # Make GraphQL request
-            headers = _build_auth_headers(api_key)
-
-            logger.info(f"CJ GraphQL search: '{term}'")
-            response = requests.post(
-                CJ_GRAPHQL_ENDPOINT,
-                json={"query": query},
-                headers=headers,
-                timeout=30
-            )
-
-            # Handle errors
-            if response.status_code == 401:
-                logger.error("CJ authentication failed - check CJ_API_KEY")
-                return []
-            elif response.status_code == 403:
-                logger.warning("CJ 403 - not joined to any advertisers or access denied")
+        live_terms.append(term)
+
+    # One request per uncached term, issued concurrently behind the shared
+    # rate limiter in waves of CJ_MAX_PARALLEL_SEARCHES. Results are merged
+    # in term order, so higher-priority terms still fill the target first,
+    # and no further wave is sent once the target is met.
+    limit = min(50, target_count)
+    for start in range(0, len(live_terms), CJ_MAX_PARALLEL_SEARCHES):
+        if len(all_products) >= target_count:
+            break
+        wave = live_terms[start:start + CJ_MAX_PARALLEL_SEARCHES]
+        with ThreadPoolExecutor(max_workers=len(wave)) as executor:
+            futures = [
+                executor.submit(_search_cj_term, term, api_key, cid, pid, limit, joined_only)
+                for term in wave
+            ]
+            try:
+                for future in futures:
+                    all_products.extend(future.result())
+            except _CJAuthError:
                 return []
-            elif response.status_code == 429:
-                logger.warning("CJ rate limit exceeded - waiting 60s...")
-                time.sleep(60)
-                continue
-            elif response.status_code != 200:
-                logger.error(f"CJ API error {response.status_code}: {response.text}")
-                continue
-
-            # Parse GraphQL response
-            data = response.json()
-
-            # Check for GraphQL errors
-            if 'errors' in data:
-                logger.error(f"CJ GraphQL errors: {data['errors']}")
-                continue
-
-            # Parse products
-            products = _parse_graphql_response(data, term)
-
-            all_products.extend(products)
-            logger.info(f"CJ search '{term}': found {len(products)} products")
-
-            # Stop if we have enough
-            if len(all_products) >= target_count:
-                break
-
-        except requests.RequestException as e:
-            logger.error(f"CJ API request failed for '{term}': {e}")
-            continue
-        except Exception as e:
-            logger.error(f"Unexpected error in CJ search for '{term}': {e}")
-            continue
 
     # Merge static partner products with GraphQL results and deduplicate
     all_products.extend(static_products)
@@ -1,125 +1,157 @@
 """
 Application settings - centralized configuration from environment variables
 Validates and provides type-safe access to all config
+
+Each settings group reads its fields straight from the _ENV snapshot in a
+plain __init__ (no per-field default_factory closures).
 """
 
 import os
 import logging
-from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Optional
 
 logger = logging.getLogger('giftwise')
 
+# Snapshot of the process environment that every settings field reads from.
+# Refreshed when the settings singleton is (re)built, so values loaded by
+# load_dotenv() after this module is imported are still picked up.
+_ENV: dict[str, str] = dict(os.environ)
+
+
+def _refresh_env():
+    _ENV.clear()
+    _ENV.update(os.environ)
+
 
-@dataclass
 class APISettings:
     """External API credentials"""
-    # Core APIs
-    anthropic_api_key: str = field(default_factory=lambda: os.environ.get('ANTHROPIC_API_KEY', ''))
-    apify_api_token: str = field(default_factory=lambda: os.environ.get('APIFY_API_TOKEN', ''))
-    serpapi_api_key: str = field(default_factory=lambda: os.environ.get('SERPAPI_API_KEY', ''))
-    unsplash_access_key: str = field(default_factory=lambda: os.environ.get('UNSPLASH_ACCESS_KEY', ''))
-
-    # Google APIs
-    google_cse_api_key: str = field(default_factory=lambda: os.environ.get('GOOGLE_CSE_API_KEY', ''))
-    google_custom_search_engine_id: str = field(default_factory=lambda: os.environ.get('GOOGLE_CUSTOM_SEARCH_ENGINE_ID', ''))
-    google_youtube_api_key: str = field(default_factory=lambda: os.environ.get('GOOGLE_YOUTUBE_API_KEY', ''))
-
-    # Stripe
-    stripe_secret_key: str = field(default_factory=lambda: os.environ.get('STRIPE_SECRET_KEY', ''))
-    stripe_price_id: str = field(default_factory=lambda: os.environ.get('STRIPE_PRICE_ID', ''))
-    stripe_pro_price_id: str = field(default_factory=lambda: os.environ.get('STRIPE_PRO_PRICE_ID', ''))
-    stripe_pro_annual_price_id: str = field(default_factory=lambda: os.environ.get('STRIPE_PRO_ANNUAL_PRICE_ID', ''))
-    stripe_premium_price_id: str = field(default_factory=lambda: os.environ.get('STRIPE_PREMIUM_PRICE_ID', ''))
-
-
-@dataclass
+
+    def __init__(self, env: dict = _ENV):
+        # Core APIs
+        self.anthropic_api_key: str = env.get('ANTHROPIC_API_KEY', '')
+        self.apify_api_token: str = env.get('APIFY_API_TOKEN', '')
+        self.serpapi_api_key: str = env.get('SERPAPI_API_KEY', '')
+        self.unsplash_access_key: str = env.get('UNSPLASH_ACCESS_KEY', '')
+
+        # Google APIs
+        self.google_cse_api_key: str = env.get('GOOGLE_CSE_API_KEY', '')
+        self.google_custom_search_engine_id: str = env.get('GOOGLE_CUSTOM_SEARCH_ENGINE_ID', '')
+        self.google_youtube_api_key: str = env.get('GOOGLE_YOUTUBE_API_KEY', '')
+
+        # Stripe
+        self.stripe_secret_key: str = env.get('STRIPE_SECRET_KEY', '')
+        self.stripe_price_id: str = env.get('STRIPE_PRICE_ID', '')
+        self.stripe_pro_price_id: str = env.get('STRIPE_PRO_PRICE_ID', '')
+        self.stripe_pro_annual_price_id: str = env.get('STRIPE_PRO_ANNUAL_PRICE_ID', '')
+        self.stripe_premium_price_id: str = env.get('STRIPE_PREMIUM_PRICE_ID', '')
+
+
 class RetailerAPISettings:
     """Retailer/affiliate network API credentials"""
-    # Etsy
-    etsy_api_key: str = field(default_factory=lambda: os.environ.get('ETSY_API_KEY', ''))
-    etsy_client_id: str = field(default_factory=lambda: os.environ.get('ETSY_CLIENT_ID', ''))
-    etsy_client_secret: str = field(default_factory=lambda: os.environ.get('ETSY_CLIENT_SECRET', ''))
-    etsy_redirect_uri: str = field(default_factory=lambda: os.environ.get('ETSY_REDIRECT_URI', 'http://localhost:5000/oauth/etsy/callback'))
 
-    # Awin
-    awin_data_feed_api_key: str = field(default_factory=lambda: os.environ.get('AWIN_DATA_FEED_API_KEY', ''))
+    def __init__(self, env: dict = _ENV):
+        # Etsy
+        self.etsy_api_key: str = env.get('ETSY_API_KEY', '')
+        self.etsy_client_id: str = env.get('ETSY_CLIENT_ID', '')
+        self.etsy_client_secret: str = env.get('ETSY_CLIENT_SECRET', '')
+        self.etsy_redirect_uri: str = env.get('ETSY_REDIRECT_URI', 'http://localhost:5000/oauth/etsy/callback')
 
-    # eBay
-    ebay_client_id: str = field(default_factory=lambda: os.environ.get('EBAY_CLIENT_ID', ''))
-    ebay_client_secret: str = field(default_factory=lambda: os.environ.get('EBAY_CLIENT_SECRET', ''))
+        # Awin
+        self.awin_data_feed_api_key: str = env.get('AWIN_DATA_FEED_API_KEY', '')
 
-    # ShareASale
-    shareasale_affiliate_id: str = field(default_factory=lambda: os.environ.get('SHAREASALE_AFFILIATE_ID', ''))
-    shareasale_api_token: str = field(default_factory=lambda: os.environ.get('SHAREASALE_API_TOKEN', ''))
-    shareasale_api_secret: str = field(default_factory=lambda: os.environ.get('SHAREASALE_API_SECRET', ''))
+        # eBay
+        self.ebay_client_id: str = env.get('EBAY_CLIENT_ID', '')
+        self.ebay_client_secret: str = env.get('EBAY_CLIENT_SECRET', '')
 
-    # Amazon (RapidAPI)
-    rapidapi_key: str = field(default_factory=lambda: os.environ.get('RAPIDAPI_KEY', ''))
-    amazon_affiliate_tag: str = field(default_factory=lambda: os.environ.get('AMAZON_AFFILIATE_TAG', ''))
+        # ShareASale
+        self.shareasale_affiliate_id: str = env.get('SHAREASALE_AFFILIATE_ID', '')
+        self.shareasale_api_token: str = env.get('SHAREASALE_API_TOKEN', '')
+        self.shareasale_api_secret: str = env.get('SHAREASALE_API_SECRET', '')
+
+        # Amazon (RapidAPI)
+        self.rapidapi_key: str = env.get('RAPIDAPI_KEY', '')
+        self.amazon_affiliate_tag: str = env.get('AMAZON_AFFILIATE_TAG', '')
 
 
-@dataclass
 class OAuthSettings:
     """OAuth provider credentials"""
-    # Pinterest
-    pinterest_client_id: str = field(default_factory=lambda: os.environ.get('PINTEREST_CLIENT_ID', ''))
-    pinterest_client_secret: str = field(default_factory=lambda: os.environ.get('PINTEREST_CLIENT_SECRET', ''))
-    pinterest_redirect_uri: str = field(default_factory=lambda: os.environ.get('PINTEREST_REDIRECT_URI', 'http://localhost:5000/oauth/pinterest/callback'))
 
-    # Spotify
-    spotify_client_id: str = field(default_factory=lambda: os.environ.get('SPOTIFY_CLIENT_ID', ''))
-    spotify_client_secret: str = field(default_factory=lambda: os.environ.get('SPOTIFY_CLIENT_SECRET', ''))
-    spotify_redirect_uri: str = field(default_factory=lambda: os.environ.get('SPOTIFY_REDIRECT_URI', 'http://localhost:5000/oauth/spotify/callback'))
+    def __init__(self, env: dict = _ENV):
+        # Pinterest
+        self.pinterest_client_id: str = env.get('PINTEREST_CLIENT_ID', '')
+        self.pinterest_client_secret: str = env.get('PINTEREST_CLIENT_SECRET', '')
+        self.pinterest_redirect_uri: str = env.get('PINTEREST_REDIRECT_URI', 'http://localhost:5000/oauth/pinterest/callback')
+
+        # Spotify
+        self.spotify_client_id: str = env.get('SPOTIFY_CLIENT_ID', '')
+        self.spotify_client_secret: str = env.get('SPOTIFY_CLIENT_SECRET', '')
+        self.spotify_redirect_uri: str = env.get('SPOTIFY_REDIRECT_URI', 'http://localhost:5000/oauth/spotify/callback')
 
-    # Google
-    google_client_id: str = field(default_factory=lambda: os.environ.get('GOOGLE_CLIENT_ID', ''))
-    google_client_secret: str = field(default_factory=lambda: os.environ.get('GOOGLE_CLIENT_SECRET', ''))
-    google_redirect_uri: str = field(default_factory=lambda: os.environ.get('GOOGLE_REDIRECT_URI', 'http://localhost:5000/oauth/google/callback'))
+        # Google
+        self.google_client_id: str = env.get('GOOGLE_CLIENT_ID', '')
+        self.google_client_secret: str = env.get('GOOGLE_CLIENT_SECRET', '')
+        self.google_redirect_uri: str = env.get('GOOGLE_REDIRECT_URI', 'http://localhost:5000/oauth/google/callback')
 
 
-@dataclass
 class ClaudeSettings:
     """Claude model configuration for A/B testing"""
-    profile_model: str = field(default_factory=lambda: os.environ.get('CLAUDE_PROFILE_MODEL', 'claude-sonnet-4-20250514'))
-    curator_model: str = field(default_factory=lambda: os.environ.get('CLAUDE_CURATOR_MODEL', 'claude-sonnet-4-20250514'))
 
-    def __post_init__(self):
-        """Log which models are configured"""
-        logger.info(f"Claude models — profile: {self.profile_model}, curator: {self.curator_model}")
+    def __init__(self, env: dict = _ENV):
+        self.profile_model: str = env.get('CLAUDE_PROFILE_MODEL', 'claude-sonnet-4-20250514')
+        self.curator_model: str = env.get('CLAUDE_CURATOR_MODEL', 'claude-sonnet-4-20250514')
 
 
-@dataclass
 class AppSettings:
     """Core application settings"""
-    # Flask
-    secret_key: str = field(default_factory=lambda: os.environ.get('SECRET_KEY', ''))
-    port: int = field(default_factory=lambda: int(os.environ.get('PORT', '5000')))
-    debug: bool = field(default_factory=lambda: os.environ.get('FLASK_DEBUG', 'False').lower() == 'true')
 
-    # Admin
-    admin_dashboard_key: str = field(default_factory=lambda: os.environ.get('ADMIN_DASHBOARD_KEY', ''))
+    def __init__(self, env: dict = _ENV):
+        # Flask
+        self.secret_key: str = env.get('SECRET_KEY', '')
+        self.port: int = int(env.get('PORT', '5000'))
+        self.debug: bool = env.get('FLASK_DEBUG', 'False').lower() == 'true'
+
+        # Admin
+        self.admin_dashboard_key: str = env.get('ADMIN_DASHBOARD_KEY', '')
 
-    # Performance
-    max_concurrent_scrapers: int = field(default_factory=lambda: int(os.environ.get('MAX_CONCURRENT_SCRAPERS', '8')))
+        # Performance
+        self.max_concurrent_scrapers: int = int(env.get('MAX_CONCURRENT_SCRAPERS', '8'))
 
-    def __post_init__(self):
-        """Validate required settings"""
+        # Validate required settings
         if not self.secret_key:
             logger.warning("SECRET_KEY not set - sessions will not persist across restarts")
 
 
-@dataclass
 class Settings:
     """
     Master settings container
     Centralized configuration for the entire application
+
+    Each group is built from the environment on first access, so a script
+    that only reads settings.app never parses the OAuth or retailer keys.
     """
-    app: AppSettings = field(default_factory=AppSettings)
-    api: APISettings = field(default_factory=APISettings)
-    retailers: RetailerAPISettings = field(default_factory=RetailerAPISettings)
-    oauth: OAuthSettings = field(default_factory=OAuthSettings)
-    claude: ClaudeSettings = field(default_factory=ClaudeSettings)
+
+    @cached_property
+    def app(self) -> AppSettings:
+        return AppSettings()
+
+    @cached_property
+    def api(self) -> APISettings:
+        return APISettings()
+
+    @cached_property
+    def retailers(self) -> RetailerAPISettings:
+        return RetailerAPISettings()
+
+    @cached_property
+    def oauth(self) -> OAuthSettings:
+        return OAuthSettings()
+
+    @cached_property
+    def claude(self) -> ClaudeSettings:
+        claude = ClaudeSettings()
+        logger.info(f"Claude models — profile: {claude.profile_model}, curator: {claude.curator_model}")
+        return claude
 
     def validate_critical(self) -> list[str]:
         """
@@ -168,6 +200,7 @@ def get_settings() -> Settings:
     """
     global _settings
     if _settings is None:
+        _refresh_env()
         _settings = Settings()
 
         # Validate critical settings
@@ -11,44 +11,169 @@ Date: February 2026
 import sqlite3
 import os
 import json
+import hashlib
+import time
+import random
+import atexit
 import logging
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+# zstd-compressed profile_json blobs are a few times smaller than the TEXT
+# column, shrinking cached_profiles pages on disk and in the page cache.
+# Without zstandard, profiles are stored as plain TEXT as before.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# orjson serializes interest tags and profile blobs several times faster than
+# the stdlib; optional so the module still works where it isn't installed.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
 # Database location
 DB_PATH = os.environ.get('DATABASE_PATH', '/home/user/GiftWise/data/products.db')
 
-
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections"""
+# Created once at import rather than on every connection open
+try:
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, timeout=10)
+except OSError as e:
+    logger.error(f"Could not create database directory for {DB_PATH}: {e}")
+
+# One long-lived connection per thread instead of an open/PRAGMA/close cycle on
+# every helper call. Keyed by (pid, DB_PATH) so a forked worker or a changed
+# DB_PATH (tests) gets a fresh connection rather than a stale one.
+_tls = threading.local()
+_open_connections = []
+_open_connections_lock = threading.Lock()
+
+# Applied once per pooled connection. WAL lets readers run alongside the
+# catalog-refresh writer; mmap and a larger page cache cut read syscalls on
+# the products table. cache_size is per connection (negative = KiB), so it
+# is kept at 64 MB rather than higher with several workers per container.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # Better read/write concurrency
+    "PRAGMA synchronous=NORMAL",      # Safe + faster than FULL under WAL
+    "PRAGMA mmap_size=268435456",     # 256 MB memory-mapped reads
+    "PRAGMA cache_size=-65536",       # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",       # ORDER BY / window-function temp b-trees in RAM
+    "PRAGMA wal_autocheckpoint=1000", # Checkpoint every ~1000 pages (the default, made explicit)
+)
+
+
+def _new_connection() -> sqlite3.Connection:
+    """Open a pooled connection. Autocommit mode: get_db_connection() owns BEGIN/COMMIT."""
+    conn = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None,
+                           check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row  # Return rows as dicts
-    conn.execute("PRAGMA journal_mode=WAL")   # Better read/write concurrency
-    conn.execute("PRAGMA synchronous=NORMAL") # Safe + faster than FULL under WAL
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    with _open_connections_lock:
+        _open_connections.append(conn)
+    return conn
+
+
+def _thread_connection() -> sqlite3.Connection:
+    """Return this thread's pooled connection, opening it on first use."""
+    key = (os.getpid(), DB_PATH)
+    if getattr(_tls, 'key', None) != key:
+        _tls.conn = _new_connection()
+        _tls.key = key
+        _tls.depth = 0
+    return _tls.conn
+
+
+@atexit.register
+def _close_connections():
+    """Close every pooled connection at interpreter exit, letting SQLite refresh planner stats first."""
+    with _open_connections_lock:
+        conns = list(_open_connections)
+        _open_connections.clear()
+    for conn in conns:
+        try:
+            conn.execute("PRAGMA optimize")
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@contextmanager
+def get_db_connection(transaction: bool = True, immediate: bool = False):
+    """
+    Context manager for database connections.
+
+    Yields this thread's pooled connection wrapped in a transaction: commits
+    on success, rolls back on error. Nested use joins the outer transaction.
+    Read-only helpers pass transaction=False to skip BEGIN/COMMIT and run
+    their statements in autocommit mode. immediate=True takes the write lock
+    at BEGIN, for read-then-write transactions that other processes race.
+    """
+    conn = _thread_connection()
+    outermost = _tls.depth == 0
+    begin = outermost and transaction
+    if begin:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    _tls.depth += 1
     try:
         yield conn
-        conn.commit()
+        if begin:
+            conn.execute("COMMIT")
     except Exception as e:
-        conn.rollback()
+        if begin and conn.in_transaction:
+            conn.execute("ROLLBACK")
         logger.error(f"Database error: {e}")
         raise
     finally:
-        conn.close()
+        _tls.depth -= 1
+
+
+# Stored in PRAGMA user_version once init_database has applied the schema.
+# Bump it whenever the DDL below changes so existing databases re-run it.
+SCHEMA_VERSION = 6
 
 
 def init_database():
     """
     Initialize database schema.
-    Safe to run multiple times (IF NOT EXISTS clauses).
+    Safe to run multiple times (IF NOT EXISTS clauses). A database already at
+    SCHEMA_VERSION skips the DDL entirely.
     """
-    with get_db_connection() as conn:
+    with get_db_connection(transaction=False) as conn:
+        current = conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+    if current:
+        # Seed on every boot, not only after DDL: a seed that failed once
+        # after user_version was stamped is retried here.
+        _seed_interest_intelligence_if_empty()
+        return
+
+    # Workers booting together all land here on a fresh or outdated file.
+    # IMMEDIATE makes them queue on the write lock instead of failing to
+    # upgrade a read lock mid-DDL; the re-check lets the losers return.
+    with get_db_connection(immediate=True) as conn:
         cursor = conn.cursor()
 
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
+
         # Products table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS products (
@@ -85,12 +210,36 @@ def init_database():
         """)
 
         # Indexes for fast queries
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_interest_tags ON products(interest_tags)")
+        # interest_tags is only ever matched with leading-wildcard LIKE, which
+        # can't use a b-tree index, so this index only slowed every write.
+        cursor.execute("DROP INDEX IF EXISTS idx_interest_tags")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_retailer ON products(retailer)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_in_stock ON products(in_stock)")
+        # in_stock = 1 holds for nearly every row, so an index on it only lured
+        # the planner away from the partial live-row indexes below.
+        cursor.execute("DROP INDEX IF EXISTS idx_in_stock")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_brand ON products(brand)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_category ON products(category)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_popularity ON products(popularity_score)")
+        # Partial indexes over live rows only: the search queries always filter
+        # in_stock = 1 AND removed_at IS NULL, so these serve the ORDER BY
+        # directly instead of sorting the filtered set.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_active_pop
+            ON products(popularity_score DESC)
+            WHERE in_stock = 1 AND removed_at IS NULL
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_retailer_updated
+            ON products(retailer, last_updated DESC)
+            WHERE in_stock = 1 AND removed_at IS NULL
+        """)
+
+        # The trigger-maintained product_interests index ran json_each on every
+        # catalog write for a lookup no production path used; drop it.
+        for trigger in ('trg_products_interests_ai', 'trg_products_interests_au',
+                        'trg_products_interests_ad'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP TABLE IF EXISTS product_interests")
 
         # Profile cache table (save Claude API costs)
         cursor.execute("""
@@ -104,7 +253,18 @@ def init_database():
             )
         """)
 
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_profile_hash ON cached_profiles(profile_hash)")
+        # profile_hash is UNIQUE, so its autoindex already serves the cache
+        # lookup; a second index on the same column only doubled write cost.
+        cursor.execute("DROP INDEX IF EXISTS idx_profile_hash")
+        # Keys are now 16-byte BLOBs (see _profile_key); rows under the old
+        # 64-char hex TEXT keys can never be hit again.
+        cursor.execute("DELETE FROM cached_profiles WHERE typeof(profile_hash) = 'text'")
+        # Compressed profile body; rows written before this column existed keep
+        # their TEXT profile_json and are converted on their next cache_profile.
+        try:
+            cursor.execute("ALTER TABLE cached_profiles ADD COLUMN profile_blob BLOB")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_expires ON cached_profiles(expires_at)")
 
         # Database metadata (track refresh status)
@@ -178,6 +338,12 @@ def init_database():
             )
         """)
 
+        # Refresh sqlite_stat1 so the planner knows about the partial indexes.
+        # analysis_limit keeps this a sampled pass on large catalogs.
+        cursor.execute("PRAGMA analysis_limit = 1000")
+        cursor.execute("ANALYZE")
+
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         logger.info("Database schema initialized (with product/interest intelligence)")
 
     # Seed interest intelligence from enrichment_data.py if table is empty
@@ -191,13 +357,13 @@ def _seed_interest_intelligence_if_empty():
     Handles Railway ephemeral storage (DB resets on each deploy).
     """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM interest_intelligence")
-            count = cursor.fetchone()[0]
+        with get_db_connection(transaction=False) as conn:
+            seeded = conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM interest_intelligence)"
+            ).fetchone()[0]
 
-        if count > 0:
-            logger.debug(f"interest_intelligence already seeded ({count} rows) — skipping")
+        if seeded:
+            logger.debug("interest_intelligence already seeded — skipping")
             return
 
         # Table is empty — seed from static enrichment data
@@ -215,8 +381,8 @@ def _seed_interest_intelligence_if_empty():
                     VALUES (?, ?, ?, ?)
                 """, (
                     interest_name,
-                    json.dumps(data.get('do_buy', [])),
-                    json.dumps(data.get('dont_buy', [])),
+                    _json_dumps(data.get('do_buy', [])),
+                    _json_dumps(data.get('dont_buy', [])),
                     trending_level,
                 ))
                 seeded += 1
@@ -233,47 +399,117 @@ def _seed_interest_intelligence_if_empty():
 # PRODUCT CRUD OPERATIONS
 # =============================================================================
 
+# Timestamps are filled in by SQLite rather than bound from Python. Same
+# local-time ISO format datetime.now().isoformat() produced (millisecond
+# precision), so string comparisons against older rows and
+# datetime.fromisoformat() in models.py keep working.
+SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+# Same, shifted by a bound modifier such as '-7 days' or '+7 days'.
+SQL_NOW_OFFSET = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime', ?)"
+
+_UPSERT_PRODUCT_COLUMNS = """
+    INSERT INTO products (
+        product_id, retailer, title, description, price, currency,
+        image_url, affiliate_link, brand, category, interest_tags,
+        in_stock, last_checked, last_updated
+    ) VALUES"""
+
+_UPSERT_PRODUCT_ROW = f"(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {SQL_NOW}, {SQL_NOW})"
+
+_UPSERT_PRODUCT_CONFLICT = """
+    ON CONFLICT(product_id, retailer) DO UPDATE SET
+        title = excluded.title,
+        description = excluded.description,
+        price = excluded.price,
+        image_url = excluded.image_url,
+        affiliate_link = excluded.affiliate_link,
+        in_stock = excluded.in_stock,
+        last_checked = excluded.last_checked,
+        last_updated = excluded.last_updated
+"""
+
+_UPSERT_PRODUCT_SQL = f"{_UPSERT_PRODUCT_COLUMNS} {_UPSERT_PRODUCT_ROW}{_UPSERT_PRODUCT_CONFLICT}"
+
+# Bound parameters per product row. Multi-row upserts stay under SQLite's
+# conservative 999-variable limit (older builds' SQLITE_MAX_VARIABLE_NUMBER).
+_PRODUCT_PARAM_COUNT = 12
+_MAX_ROWS_PER_UPSERT = 999 // _PRODUCT_PARAM_COUNT
+
+
+@lru_cache(maxsize=8)
+def _upsert_products_sql(n_rows: int) -> str:
+    """Multi-row VALUES upsert for n_rows products."""
+    rows = ",\n        ".join([_UPSERT_PRODUCT_ROW] * n_rows)
+    return f"{_UPSERT_PRODUCT_COLUMNS}\n        {rows}{_UPSERT_PRODUCT_CONFLICT}"
+
+
+def _product_params(product: Dict) -> tuple:
+    """Bind parameters for one _UPSERT_PRODUCT_ROW, in column order."""
+    return (
+        product.get('product_id'),
+        product.get('retailer'),
+        product.get('title'),
+        product.get('description', ''),
+        product.get('price'),
+        product.get('currency', 'USD'),
+        product.get('image_url'),
+        product.get('affiliate_link'),
+        product.get('brand'),
+        product.get('category'),
+        _json_dumps(product.get('interest_tags', [])),
+        product.get('in_stock', True),
+    )
+
+
 def upsert_product(product: Dict) -> int:
     """
     Insert or update a product.
     Returns product ID.
     """
     with get_db_connection() as conn:
-        cursor = conn.cursor()
+        # lastrowid isn't set when the ON CONFLICT branch updates an existing
+        # row; RETURNING gives the id on both paths with no extra SELECT.
+        return conn.execute(_UPSERT_PRODUCT_SQL + " RETURNING id", _product_params(product)).fetchone()[0]
 
-        cursor.execute("""
-            INSERT INTO products (
-                product_id, retailer, title, description, price, currency,
-                image_url, affiliate_link, brand, category, interest_tags,
-                in_stock, last_checked, last_updated
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(product_id, retailer) DO UPDATE SET
-                title = excluded.title,
-                description = excluded.description,
-                price = excluded.price,
-                image_url = excluded.image_url,
-                affiliate_link = excluded.affiliate_link,
-                in_stock = excluded.in_stock,
-                last_checked = excluded.last_checked,
-                last_updated = excluded.last_updated
-        """, (
-            product.get('product_id'),
-            product.get('retailer'),
-            product.get('title'),
-            product.get('description', ''),
-            product.get('price'),
-            product.get('currency', 'USD'),
-            product.get('image_url'),
-            product.get('affiliate_link'),
-            product.get('brand'),
-            product.get('category'),
-            json.dumps(product.get('interest_tags', [])),
-            product.get('in_stock', True),
-            datetime.now().isoformat(),
-            datetime.now().isoformat()
-        ))
 
-        return cursor.lastrowid
+def upsert_products_bulk(products: List[Dict], batch_size: int = 500) -> int:
+    """
+    Insert or update many products in one transaction.
+    Use this for catalog refreshes instead of calling upsert_product per row.
+    Rows are sent as multi-row VALUES statements of up to
+    min(batch_size, _MAX_ROWS_PER_UPSERT) products each.
+    Returns the number of products written.
+    """
+    if not products:
+        return 0
+    rows_per_statement = max(1, min(batch_size, _MAX_ROWS_PER_UPSERT))
+    with get_db_connection() as conn:
+        for start in range(0, len(products), rows_per_statement):
+            batch = products[start:start + rows_per_statement]
+            params = [value for product in batch for value in _product_params(product)]
+            conn.execute(_upsert_products_sql(len(batch)), params)
+    return len(products)
+
+
+_GENERIC_INTEREST_WORDS = frozenset({
+    # Structural/function words
+    "and", "the", "or", "with", "gift", "accessories",
+    "lover", "fan", "from", "for", "set", "kit",
+    # Words too common in product titles/descriptions to be meaningful as
+    # standalone search terms. "show" matches every product with "show" in
+    # its description. These only cause false positives when they're the
+    # sole matching keyword from a compound interest like "community tv show".
+    "show", "new", "old", "style", "culture", "activities",
+    "life", "home", "care", "world", "day",
+    "best", "good", "real", "special", "classic", "modern",
+    "club", "group", "type", "stuff",
+    # Words that match too many unrelated products in a 167k product catalog.
+    # "productions" matches "music production gear", "cult" matches "cult classic",
+    # "local" matches any local business, "records" matches vinyl records unrelated
+    # to "Empire Records" the film.
+    "productions", "production", "cult", "local", "films",
+    "records", "advocacy", "justice", "social",
+})
 
 
 def _interest_to_keywords(interest: str) -> List[str]:
@@ -282,26 +518,56 @@ def _interest_to_keywords(interest: str) -> List[str]:
     Mirrors the logic in catalog_sync._tag_awin_product_with_interests so that
     profile interests (e.g. 'dog care') match sync tags (e.g. 'dog toy', 'dog treats').
     """
-    GENERIC = {
-        # Structural/function words
-        "and", "the", "or", "with", "gift", "accessories",
-        "lover", "fan", "from", "for", "set", "kit",
-        # Words too common in product titles/descriptions to be meaningful as
-        # standalone search terms. "show" matches every product with "show" in
-        # its description. These only cause false positives when they're the
-        # sole matching keyword from a compound interest like "community tv show".
-        "show", "new", "old", "style", "culture", "activities",
-        "life", "home", "care", "world", "day",
-        "best", "good", "real", "special", "classic", "modern",
-        "club", "group", "type", "stuff",
-        # Words that match too many unrelated products in a 167k product catalog.
-        # "productions" matches "music production gear", "cult" matches "cult classic",
-        # "local" matches any local business, "records" matches vinyl records unrelated
-        # to "Empire Records" the film.
-        "productions", "production", "cult", "local", "films",
-        "records", "advocacy", "justice", "social",
-    }
-    return [w.lower() for w in interest.split() if len(w) > 2 and w.lower() not in GENERIC]
+    return [w.lower() for w in interest.split() if len(w) > 2 and w.lower() not in _GENERIC_INTEREST_WORDS]
+
+
+@lru_cache(maxsize=512)
+def _interest_condition_group(interest: str) -> Tuple[tuple, tuple]:
+    """
+    SQL conditions and LIKE params for ONE interest (see
+    _build_interest_conditions). Cached because the same profile interests
+    are matched repeatedly across searches within a session.
+    """
+    group_conds = []
+    group_params = []
+
+    # 1. Exact tag match (always — strongest signal)
+    group_conds.append("interest_tags LIKE ?")
+    group_params.append(f'%"{interest.lower()}"%')
+
+    keywords = _interest_to_keywords(interest)
+
+    if keywords:
+        if len(keywords) == 1:
+            kw = keywords[0]
+            # Skip overly short keywords that match too broadly
+            if len(kw) >= 4:
+                # Tag match: keyword appears at start of tag value or after a space
+                group_conds.append("(interest_tags LIKE ? OR interest_tags LIKE ?)")
+                group_params.append(f'%"{kw}%')      # starts a tag value: ["rafting...]
+                group_params.append(f'% {kw}%')       # after a space within a tag
+                # Title match: word-boundary matching
+                group_conds.append("(title LIKE ? OR title LIKE ? OR title LIKE ?)")
+                group_params.append(f'{kw}%')         # starts the title
+                group_params.append(f'% {kw}%')       # after a space
+                group_params.append(f'%-{kw}%')       # after a hyphen
+        elif len(keywords) == 2:
+            # 2-keyword interests: tag AND match + title AND match
+            # Both words must appear together — "fly" alone won't match "Zipper Fly"
+            tag_ands = " AND ".join(["interest_tags LIKE ?" for _ in keywords])
+            group_conds.append(f"({tag_ands})")
+            group_params.extend(f'%{kw}%' for kw in keywords)
+
+            title_ands = " AND ".join(["LOWER(title) LIKE ?" for _ in keywords])
+            group_conds.append(f"({title_ands})")
+            group_params.extend(f'%{kw}%' for kw in keywords)
+        else:
+            # 3+ keyword interests: ONLY match in tags, NOT in title.
+            tag_ands = " AND ".join(["interest_tags LIKE ?" for _ in keywords])
+            group_conds.append(f"({tag_ands})")
+            group_params.extend(f'%{kw}%' for kw in keywords)
+
+    return tuple(group_conds), tuple(group_params)
 
 
 def _build_interest_conditions(interests: List[str]):
@@ -333,45 +599,8 @@ def _build_interest_conditions(interests: List[str]):
     interest_groups = []  # per-interest groups for relevance scoring
 
     for interest in interests:
-        group_conds = []
-        group_params = []
-
-        # 1. Exact tag match (always — strongest signal)
-        group_conds.append("interest_tags LIKE ?")
-        group_params.append(f'%"{interest.lower()}"%')
-
-        keywords = _interest_to_keywords(interest)
-
-        if keywords:
-            if len(keywords) == 1:
-                kw = keywords[0]
-                # Skip overly short keywords that match too broadly
-                if len(kw) >= 4:
-                    # Tag match: keyword appears at start of tag value or after a space
-                    group_conds.append("(interest_tags LIKE ? OR interest_tags LIKE ?)")
-                    group_params.append(f'%"{kw}%')      # starts a tag value: ["rafting...]
-                    group_params.append(f'% {kw}%')       # after a space within a tag
-                    # Title match: word-boundary matching
-                    group_conds.append("(title LIKE ? OR title LIKE ? OR title LIKE ?)")
-                    group_params.append(f'{kw}%')         # starts the title
-                    group_params.append(f'% {kw}%')       # after a space
-                    group_params.append(f'%-{kw}%')       # after a hyphen
-            elif len(keywords) == 2:
-                # 2-keyword interests: tag AND match + title AND match
-                # Both words must appear together — "fly" alone won't match "Zipper Fly"
-                tag_ands = " AND ".join(["interest_tags LIKE ?" for _ in keywords])
-                group_conds.append(f"({tag_ands})")
-                group_params.extend(f'%{kw}%' for kw in keywords)
-
-                title_ands = " AND ".join(["LOWER(title) LIKE ?" for _ in keywords])
-                group_conds.append(f"({title_ands})")
-                group_params.extend(f'%{kw}%' for kw in keywords)
-            else:
-                # 3+ keyword interests: ONLY match in tags, NOT in title.
-                tag_ands = " AND ".join(["interest_tags LIKE ?" for _ in keywords])
-                group_conds.append(f"({tag_ands})")
-                group_params.extend(f'%{kw}%' for kw in keywords)
-
+        group_conds, group_params = _interest_condition_group(interest)
+        group_conds, group_params = list(group_conds), list(group_params)
         condition_parts.extend(group_conds)
         params.extend(group_params)
         interest_groups.append((interest, group_conds, group_params))
@@ -379,30 +608,47 @@ def _build_interest_conditions(interests: List[str]):
     return condition_parts, params, interest_groups
 
 
+SEARCH_OVERFETCH = 3
+
+
+def _shuffle_ties(rows: List[Dict], limit: int) -> List[Dict]:
+    """Random order within equal popularity_score, highest first, cut to limit."""
+    random.shuffle(rows)
+    rows.sort(key=lambda r: r.get('popularity_score') or 0, reverse=True)  # stable: keeps shuffled ties
+    return rows[:limit]
+
+
 def search_products_by_interests(interests: List[str], limit: int = 100) -> List[Dict]:
     """
     Search products matching any of the given interests.
     Returns list of product dicts.
+
+    Ties in popularity_score are broken randomly. Rather than ORDER BY
+    RANDOM() (a random key per candidate row plus a full sort), the query
+    over-fetches SEARCH_OVERFETCH x the rows it needs by popularity alone and
+    the shuffle happens in Python.
     """
     if not interests:
         return []
 
-    with get_db_connection() as conn:
+    with get_db_connection(transaction=False) as conn:
         cursor = conn.cursor()
 
         condition_parts, params, _groups = _build_interest_conditions(interests)
         conditions = " OR ".join(condition_parts)
 
+        # Served by idx_active_pop: walks live rows in popularity order and
+        # stops at LIMIT instead of sorting every match.
         cursor.execute(f"""
             SELECT * FROM products
             WHERE in_stock = 1
               AND removed_at IS NULL
               AND ({conditions})
-            ORDER BY popularity_score DESC, RANDOM()
+            ORDER BY popularity_score DESC
             LIMIT ?
-        """, params + [limit])
+        """, params + [limit * SEARCH_OVERFETCH])
 
-        return [dict(row) for row in cursor.fetchall()]
+        return _shuffle_ties(list(map(dict, cursor)), limit)
 
 
 def search_products_diverse(interests: List[str], limit: int = 100,
@@ -421,7 +667,7 @@ def search_products_diverse(interests: List[str], limit: int = 100,
       - 'splurge_candidates': products in the splurge price range ($200-$1500)
       - 'per_interest_counts': dict of interest -> count (for eBay gap detection)
     """
-    with get_db_connection() as conn:
+    with get_db_connection(transaction=False) as conn:
         cursor = conn.cursor()
 
         if not interests:
@@ -476,7 +722,7 @@ def search_products_diverse(interests: List[str], limit: int = 100,
             LIMIT ?
         """, score_params + params + [max_per_category, limit * 2])
 
-        all_rows = [dict(row) for row in cursor.fetchall()]
+        all_rows = list(map(dict, cursor))
 
     # Separate regular vs splurge
     regular = []
@@ -496,7 +742,7 @@ def search_products_diverse(interests: List[str], limit: int = 100,
         # have DB coverage rather than which sync terms are most common.
         tags_raw = row.get('interest_tags', '[]')
         try:
-            tags = json.loads(tags_raw) if isinstance(tags_raw, str) else tags_raw
+            tags = _json_loads(tags_raw) if isinstance(tags_raw, str) else tags_raw
         except (json.JSONDecodeError, TypeError):
             tags = []
         tag_set = {t.lower().strip() for t in tags if isinstance(t, str)}
@@ -533,7 +779,7 @@ def search_products_by_title(keywords: List[str], limit: int = 10) -> List[Dict]
     if not keywords:
         return []
 
-    with get_db_connection() as conn:
+    with get_db_connection(transaction=False) as conn:
         cursor = conn.cursor()
 
         # Each keyword must appear in the title (AND logic within, scored by overlap)
@@ -550,9 +796,12 @@ def search_products_by_title(keywords: List[str], limit: int = 10) -> List[Dict]
             LIMIT ?
         """, params + [limit])
 
-        return [dict(row) for row in cursor.fetchall()]
+        return list(map(dict, cursor))
+
+
+def get_products_by_retailer(retailer: str, limit: int = 1000) -> List[Dict]:
     """Get all products from a specific retailer"""
-    with get_db_connection() as conn:
+    with get_db_connection(transaction=False) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT * FROM products
@@ -563,18 +812,7 @@ def search_products_by_title(keywords: List[str], limit: int = 10) -> List[Dict]
             LIMIT ?
         """, (retailer, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
-
-
-def increment_popularity(product_id: str, retailer: str):
-    """Increment popularity score when product is clicked/recommended"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE products
-            SET popularity_score = popularity_score + 1
-            WHERE product_id = ? AND retailer = ?
-        """, (product_id, retailer))
+        return list(map(dict, cursor))
 
 
 def mark_stale_products(days: int = 7) -> int:
@@ -582,75 +820,103 @@ def mark_stale_products(days: int = 7) -> int:
     Mark products as removed if not seen in X days.
     Returns count of marked products.
     """
-    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
             UPDATE products
-            SET removed_at = ?
-            WHERE last_checked < ?
+            SET removed_at = {SQL_NOW}
+            WHERE last_checked < {SQL_NOW_OFFSET}
               AND removed_at IS NULL
-        """, (datetime.now().isoformat(), cutoff))
+        """, (f'-{days} days',))
 
         count = cursor.rowcount
         logger.info(f"Marked {count} products as stale (not seen in {days} days)")
         return count
 
 
-def get_database_stats() -> Dict:
-    """Get database health statistics for admin dashboard"""
+def mark_stale_products_by_ids(ids: List[Tuple[str, str]]) -> int:
+    """
+    Mark specific (product_id, retailer) pairs as removed in one executemany.
+    Already-removed rows keep their original removed_at. Returns count marked.
+    """
+    if not ids:
+        return 0
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.executemany(f"""
+            UPDATE products
+            SET removed_at = {SQL_NOW}
+            WHERE product_id = ? AND retailer = ?
+              AND removed_at IS NULL
+        """, ids)
 
-        # Total products
-        cursor.execute("SELECT COUNT(*) FROM products WHERE removed_at IS NULL AND in_stock = 1")
-        total_products = cursor.fetchone()[0]
-
-        # By retailer
-        cursor.execute("""
-            SELECT retailer, COUNT(*) as count
-            FROM products
-            WHERE removed_at IS NULL AND in_stock = 1
-            GROUP BY retailer
-            ORDER BY count DESC
-        """)
-        by_retailer = {row['retailer']: row['count'] for row in cursor.fetchall()}
-
-        # Recently added (last 24 hours)
-        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-        cursor.execute("SELECT COUNT(*) FROM products WHERE created_at > ?", (yesterday,))
-        added_today = cursor.fetchone()[0]
+        count = cursor.rowcount
+        logger.info(f"Marked {count} products as stale by id")
+        return count
 
-        # Stale products (not checked in 7 days)
-        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        cursor.execute("SELECT COUNT(*) FROM products WHERE last_checked < ? AND removed_at IS NULL", (week_ago,))
-        stale_count = cursor.fetchone()[0]
 
-        # Last refresh time
-        cursor.execute("SELECT value FROM database_metadata WHERE key = 'last_refresh'")
-        row = cursor.fetchone()
-        last_refresh = row['value'] if row else 'Never'
+# Admin dashboard stats cache. Keyed by DB_PATH so tests pointing at a new
+# file don't see another database's numbers.
+_stats_cache = {}
+_stats_ts = 0
+STATS_CACHE_TTL = 60
 
-        # Top brands
-        cursor.execute("""
-            SELECT brand, COUNT(*) as count
-            FROM products
-            WHERE removed_at IS NULL AND in_stock = 1 AND brand IS NOT NULL
-            GROUP BY brand
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        top_brands = [{'brand': row['brand'], 'count': row['count']} for row in cursor.fetchall()]
 
-        return {
-            'total_products': total_products,
-            'by_retailer': by_retailer,
-            'added_today': added_today,
-            'stale_count': stale_count,
-            'last_refresh': last_refresh,
-            'top_brands': top_brands,
-        }
+def get_database_stats() -> Dict:
+    """Get database health statistics for admin dashboard (cached for STATS_CACHE_TTL seconds)"""
+    global _stats_ts
+    now = time.time()
+    if now - _stats_ts < STATS_CACHE_TTL and DB_PATH in _stats_cache:
+        return _stats_cache[DB_PATH]
+
+    # One statement, one row: the per-retailer and top-brand breakdowns come
+    # back as JSON aggregates; added/stale counts share a single pass.
+    with get_db_connection(transaction=False) as conn:
+        row = conn.execute(f"""
+            SELECT
+                (SELECT json_group_object(retailer, count) FROM (
+                    SELECT retailer, COUNT(*) AS count
+                    FROM products
+                    WHERE removed_at IS NULL AND in_stock = 1
+                    GROUP BY retailer
+                    ORDER BY count DESC
+                )) AS by_retailer,
+                (SELECT json_group_array(json_object('brand', brand, 'count', count)) FROM (
+                    SELECT brand, COUNT(*) AS count
+                    FROM products
+                    WHERE removed_at IS NULL AND in_stock = 1 AND brand IS NOT NULL
+                    GROUP BY brand
+                    ORDER BY count DESC
+                    LIMIT 10
+                )) AS top_brands,
+                counts.added_today,
+                counts.stale_count,
+                (SELECT value FROM database_metadata WHERE key = 'last_refresh') AS last_refresh
+            FROM (
+                SELECT COALESCE(SUM(created_at > {SQL_NOW_OFFSET}), 0) AS added_today,
+                       COALESCE(SUM(last_checked < {SQL_NOW_OFFSET} AND removed_at IS NULL), 0) AS stale_count
+                FROM products
+            ) AS counts
+        """, ('-1 days', '-7 days')).fetchone()
+
+    by_retailer = _json_loads(row['by_retailer'])
+    total_products = sum(by_retailer.values())
+    added_today, stale_count = row['added_today'], row['stale_count']
+    last_refresh = row['last_refresh'] or 'Never'
+    top_brands = _json_loads(row['top_brands'])
+
+    stats = {
+        'total_products': total_products,
+        'by_retailer': by_retailer,
+        'added_today': added_today,
+        'stale_count': stale_count,
+        'last_refresh': last_refresh,
+        'top_brands': top_brands,
+    }
+    _stats_cache.clear()
+    _stats_cache[DB_PATH] = stats
+    _stats_ts = now
+    return stats
 
 
 def get_total_product_count() -> int:
@@ -661,7 +927,7 @@ def get_total_product_count() -> int:
     Fast single-query; do not use get_database_stats() at session time.
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(transaction=False) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT COUNT(*) FROM products WHERE removed_at IS NULL AND in_stock = 1"
@@ -676,72 +942,197 @@ def set_metadata(key: str, value: str):
     """Set database metadata value"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
             INSERT INTO database_metadata (key, value, updated_at)
-            VALUES (?, ?, ?)
+            VALUES (?, ?, {SQL_NOW})
             ON CONFLICT(key) DO UPDATE SET
                 value = excluded.value,
                 updated_at = excluded.updated_at
-        """, (key, value, datetime.now().isoformat()))
+        """, (key, value))
+
+
+# A full ANALYZE + VACUUM rewrites the whole file, so it runs at most this often.
+VACUUM_INTERVAL_DAYS = 14
+
+
+def run_maintenance(full: Optional[bool] = None) -> bool:
+    """
+    Keep planner stats and the file in shape after refresh churn.
+
+    Always runs PRAGMA optimize. full=True also runs an exact ANALYZE and an
+    in-place VACUUM to reclaim pages freed by stale/expired rows; full=None
+    does so only when the last one is over VACUUM_INTERVAL_DAYS old.
+    Returns whether the full pass ran.
+
+    The full pass holds the write lock for the whole rewrite, longer than the
+    web workers' busy timeout on a large catalog. Only run it from the offline
+    CLI (python products/ingestion.py --maintenance) in a maintenance window;
+    the scheduled refresh calls this with full=False.
+    """
+    with get_db_connection(transaction=False) as conn:
+        cursor = conn.cursor()
+        if full is None:
+            cursor.execute(f"""
+                SELECT NOT EXISTS (
+                    SELECT 1 FROM database_metadata
+                    WHERE key = 'last_vacuum' AND updated_at > {SQL_NOW_OFFSET}
+                )
+            """, (f'-{VACUUM_INTERVAL_DAYS} days',))
+            full = bool(cursor.fetchone()[0])
+
+        cursor.execute("PRAGMA optimize").fetchall()
+        if not full:
+            return False
+
+        start = time.time()
+        cursor.execute("PRAGMA analysis_limit = 0")
+        cursor.execute("ANALYZE")
+        cursor.execute("PRAGMA analysis_limit = 1000")
+        # VACUUM in place rather than VACUUM INTO + rename: other workers hold
+        # open connections to this file and would keep reading the old inode.
+        cursor.execute("VACUUM")
+        # VACUUM goes through the WAL; truncate it so the disk space comes back
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    set_metadata('last_vacuum', datetime.now().isoformat())
+    logger.info(f"Database maintenance (ANALYZE + VACUUM) took {time.time() - start:.1f}s")
+    return True
 
 
 # =============================================================================
 # PROFILE CACHE OPERATIONS (Save Claude API costs)
 # =============================================================================
 
+PROFILE_HASH_BYTES = 16
+
+
+def hash_profile(data: bytes) -> str:
+    """
+    Hex digest used as the cached_profiles key. Callers of cache_profile /
+    get_cached_profile should hash the serialized platform data with this
+    so the key function stays in one place.
+
+    128 bits keeps the key small while staying a cryptographic hash: a
+    collision would serve one user's profile to another. Stdlib blake2b only,
+    so every host and build computes the same key for the same profile.
+    """
+    return hashlib.blake2b(data, digest_size=PROFILE_HASH_BYTES).hexdigest()
+
+
+def _profile_key(profile_hash: str) -> bytes:
+    """
+    Stored form of a hash_profile() digest: raw bytes, a quarter the size of
+    the old 64-char hex TEXT, so the UNIQUE index packs more keys per page.
+    """
+    return bytes.fromhex(profile_hash)
+
+
+# In-process LRU in front of cached_profiles: (DB_PATH, profile_hash) ->
+# (expires_at, profile_json). The pipeline looks the same hash up several
+# times per session; only misses go to SQLite.
+_profile_lru = OrderedDict()
+_profile_lru_lock = threading.Lock()
+PROFILE_LRU_MAX = 512
+
+
 def cache_profile(profile_hash: str, profile_json: str, ttl_days: int = 7):
     """Cache analyzed profile to avoid re-analyzing same social media data"""
-    expires_at = (datetime.now() + timedelta(days=ttl_days)).isoformat()
+    profile_blob = None
+    if zstandard is not None:
+        # Compressor objects aren't safe to share across threads; one per call
+        # is cheap at profile-cache write rates.
+        profile_blob = zstandard.ZstdCompressor(level=3).compress(profile_json.encode())
+        profile_json = ''
+
+    with _profile_lru_lock:
+        _profile_lru.pop((DB_PATH, profile_hash), None)
 
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO cached_profiles (profile_hash, profile_json, expires_at)
-            VALUES (?, ?, ?)
+        cursor.execute(f"""
+            INSERT INTO cached_profiles (profile_hash, profile_json, profile_blob, expires_at)
+            VALUES (?, ?, ?, {SQL_NOW_OFFSET})
             ON CONFLICT(profile_hash) DO UPDATE SET
                 profile_json = excluded.profile_json,
+                profile_blob = excluded.profile_blob,
                 expires_at = excluded.expires_at,
                 access_count = access_count + 1
-        """, (profile_hash, profile_json, expires_at))
+        """, (_profile_key(profile_hash), profile_json, profile_blob, f'+{ttl_days} days'))
 
 
 def get_cached_profile(profile_hash: str) -> Optional[Dict]:
     """Get cached profile if not expired"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT profile_json, expires_at
-            FROM cached_profiles
-            WHERE profile_hash = ?
-              AND expires_at > ?
-        """, (profile_hash, datetime.now().isoformat()))
+    now = datetime.now().isoformat()
+    key = (DB_PATH, profile_hash)
+
+    with _profile_lru_lock:
+        entry = _profile_lru.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _profile_lru.move_to_end(key)
+            else:
+                del _profile_lru[key]
+                entry = None
 
-        row = cursor.fetchone()
-        if row:
-            # Increment access count
+    if entry is None:
+        with get_db_connection(transaction=False) as conn:
+            cursor = conn.cursor()
             cursor.execute("""
-                UPDATE cached_profiles
-                SET access_count = access_count + 1
+                SELECT profile_json, profile_blob, expires_at
+                FROM cached_profiles
                 WHERE profile_hash = ?
-            """, (profile_hash,))
+                  AND expires_at > ?
+            """, (_profile_key(profile_hash), now))
+            row = cursor.fetchone()
+        if not row:
+            return None
 
-            return json.loads(row['profile_json'])
+        profile_json = row['profile_json']
+        if row['profile_blob'] is not None:
+            if zstandard is None:
+                logger.warning("Cached profile is zstd-compressed but zstandard is not installed")
+                return None
+            profile_json = zstandard.ZstdDecompressor().decompress(row['profile_blob']).decode()
 
-        return None
+        entry = (row['expires_at'], profile_json)
+        with _profile_lru_lock:
+            _profile_lru[key] = entry
+            if len(_profile_lru) > PROFILE_LRU_MAX:
+                _profile_lru.popitem(last=False)
 
+    # access_count is a stat, not read on this path: batch it with the
+    # other tracking counters.
+    track_event('profile_access', _profile_key(profile_hash), '')
+    # Parse per call so callers can mutate the dict without touching the cache
+    return _json_loads(entry[1])
 
-def clean_expired_profiles() -> int:
-    """Remove expired profile caches"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            DELETE FROM cached_profiles
-            WHERE expires_at < ?
-        """, (datetime.now().isoformat(),))
 
-        count = cursor.rowcount
-        logger.info(f"Cleaned {count} expired profile caches")
-        return count
+# Rows deleted per transaction by clean_expired_profiles; small batches keep
+# the write lock short so profile reads and caching aren't stalled behind it.
+CLEAN_BATCH_SIZE = 1000
+
+
+def clean_expired_profiles() -> int:
+    """Remove expired profile caches, committing every CLEAN_BATCH_SIZE rows"""
+    count = 0
+    while True:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                DELETE FROM cached_profiles
+                WHERE rowid IN (
+                    SELECT rowid FROM cached_profiles
+                    WHERE expires_at < {SQL_NOW}
+                    LIMIT ?
+                )
+            """, (CLEAN_BATCH_SIZE,))
+            deleted = cursor.rowcount
+        count += deleted
+        if deleted < CLEAN_BATCH_SIZE:
+            break
+
+    logger.info(f"Cleaned {count} expired profile caches")
+    return count
 
 
 # =============================================================================
@@ -750,7 +1141,7 @@ def clean_expired_profiles() -> int:
 
 def get_product_intelligence(product_id: str, retailer: str) -> Optional[Dict]:
     """Get intelligence data for a product"""
-    with get_db_connection() as conn:
+    with get_db_connection(transaction=False) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT * FROM product_intelligence
@@ -763,107 +1154,246 @@ def get_product_intelligence(product_id: str, retailer: str) -> Optional[Dict]:
         return None
 
 
+# Columns update_product_intelligence may write. Keys are interpolated into
+# SQL, so anything outside this set is rejected.
+_ALLOWED_PI_COLS = frozenset({
+    'gift_worthiness_score', 'best_for_interests', 'best_for_relationship',
+    'avoid_reasons', 'times_recommended', 'times_clicked', 'times_favorited',
+    'click_through_rate', 'commission_rate', 'estimated_commission_per_sale',
+})
+
+
+@lru_cache(maxsize=64)
+def _build_pi_upsert(keys: tuple) -> str:
+    """Upsert SQL for product_intelligence writing the given (sorted) columns."""
+    invalid = set(keys) - _ALLOWED_PI_COLS
+    if invalid:
+        raise ValueError(f"Unknown product_intelligence columns: {', '.join(sorted(invalid))}")
+    columns = ", ".join(keys)
+    placeholders = ", ".join("?" * len(keys))
+    set_clause = ", ".join(f"{key} = excluded.{key}" for key in keys)
+    return f"""
+        INSERT INTO product_intelligence (product_id, retailer, {columns}, last_updated)
+        VALUES (?, ?, {placeholders}, {SQL_NOW})
+        ON CONFLICT(product_id, retailer) DO UPDATE SET
+            {set_clause},
+            last_updated = excluded.last_updated
+    """
+
+
 def update_product_intelligence(product_id: str, retailer: str, updates: Dict):
     """Update product intelligence metrics"""
+    if not updates:
+        return
+    keys = tuple(sorted(updates))
+    sql = _build_pi_upsert(keys)
     with get_db_connection() as conn:
-        cursor = conn.cursor()
+        conn.execute(sql, [product_id, retailer] + [updates[key] for key in keys])
+
+
+# Event-tracking statements, hoisted so every call hands sqlite3 the same
+# string and hits the connection's prepared-statement cache. Each takes
+# (product_id, retailer, count) so queued events flush in bulk.
+SQL_TRACK_RECOMMENDED = f"""
+    INSERT INTO product_intelligence (product_id, retailer, times_recommended, last_updated)
+    VALUES (?1, ?2, ?3, {SQL_NOW})
+    ON CONFLICT(product_id, retailer) DO UPDATE SET
+        times_recommended = times_recommended + excluded.times_recommended,
+        last_updated = excluded.last_updated
+"""
 
-        # Build SET clause dynamically from updates dict
-        set_clauses = [f"{key} = ?" for key in updates.keys()]
-        set_clause = ", ".join(set_clauses)
-        values = list(updates.values())
+SQL_TRACK_CLICKED = f"""
+    UPDATE product_intelligence
+    SET times_clicked = times_clicked + ?3,
+        click_through_rate = CAST(times_clicked + ?3 AS REAL) / NULLIF(times_recommended, 0),
+        last_updated = {SQL_NOW}
+    WHERE product_id = ?1 AND retailer = ?2
+"""
 
-        cursor.execute(f"""
-            INSERT INTO product_intelligence (product_id, retailer, {', '.join(updates.keys())}, last_updated)
-            VALUES (?, ?, {', '.join(['?' for _ in updates])}, ?)
-            ON CONFLICT(product_id, retailer) DO UPDATE SET
-                {set_clause},
-                last_updated = ?
-        """, [product_id, retailer] + values + [datetime.now().isoformat()] + values + [datetime.now().isoformat()])
+SQL_TRACK_FAVORITED = f"""
+    UPDATE product_intelligence
+    SET times_favorited = times_favorited + ?3,
+        last_updated = {SQL_NOW}
+    WHERE product_id = ?1 AND retailer = ?2
+"""
+
+SQL_INCREMENT_POPULARITY = """
+    UPDATE products
+    SET popularity_score = popularity_score + ?3
+    WHERE product_id = ?1 AND retailer = ?2
+"""
+
+# Keyed by profile_hash alone; ?2 (retailer) is unused.
+SQL_PROFILE_ACCESS = """
+    UPDATE cached_profiles
+    SET access_count = access_count + ?3
+    WHERE profile_hash = ?1
+"""
+
+# Flush order matters: recommended creates the intelligence row and feeds the
+# CTR denominator that clicked reads.
+_TRACK_EVENT_SQL = {
+    'recommended': SQL_TRACK_RECOMMENDED,
+    'clicked': SQL_TRACK_CLICKED,
+    'favorited': SQL_TRACK_FAVORITED,
+    'popularity': SQL_INCREMENT_POPULARITY,
+    'profile_access': SQL_PROFILE_ACCESS,
+}
+
+# Counters are buffered in memory and written with one executemany per kind,
+# instead of a transaction per event. A crash loses at most the unflushed
+# counts, which is acceptable for popularity/CTR metrics.
+_event_queue = defaultdict(int)  # (kind, product_id, retailer) -> count
+_event_queue_lock = threading.Lock()
+_event_queue_since = 0.0  # time.time() of the oldest unflushed event
+EVENT_QUEUE_MAX_KEYS = 500
+# flush_tracked_events_if_due() lets events sit this long, so a burst of
+# clicks across requests shares one write instead of one per request.
+EVENT_FLUSH_INTERVAL = 5
+
+
+def track_event(kind: str, product_id: str, retailer: str):
+    """
+    Queue a recommended/clicked/favorited/popularity/profile_access event.
+    Written by flush_tracked_events(), or right away once the queue is large.
+    """
+    global _event_queue_since
+    if kind not in _TRACK_EVENT_SQL:
+        raise ValueError(f"Unknown tracking event: {kind}")
+    with _event_queue_lock:
+        if not _event_queue:
+            _event_queue_since = time.time()
+        _event_queue[(kind, product_id, retailer)] += 1
+        full = len(_event_queue) >= EVENT_QUEUE_MAX_KEYS
+    if full:
+        flush_tracked_events()
+
+
+def flush_tracked_events() -> int:
+    """
+    Write all queued tracking events in a single transaction.
+    Returns the number of (kind, product, retailer) counters written.
+    """
+    global _event_queue
+    with _event_queue_lock:
+        if not _event_queue:
+            return 0
+        pending, _event_queue = _event_queue, defaultdict(int)
+
+    by_kind = defaultdict(list)
+    for (kind, product_id, retailer), count in pending.items():
+        by_kind[kind].append((product_id, retailer, count))
+
+    with get_db_connection() as conn:
+        for kind, sql in _TRACK_EVENT_SQL.items():
+            if by_kind[kind]:
+                conn.executemany(sql, by_kind[kind])
+    return len(pending)
+
+
+def flush_tracked_events_if_due() -> int:
+    """flush_tracked_events() once the oldest queued event is EVENT_FLUSH_INTERVAL seconds old."""
+    with _event_queue_lock:
+        due = bool(_event_queue) and time.time() - _event_queue_since >= EVENT_FLUSH_INTERVAL
+    return flush_tracked_events() if due else 0
+
+
+# Registered after _close_connections so atexit (LIFO) flushes first.
+atexit.register(flush_tracked_events)
+
+
+def increment_popularity(product_id: str, retailer: str):
+    """Increment popularity score when product is clicked/recommended"""
+    track_event('popularity', product_id, retailer)
 
 
 def track_product_recommended(product_id: str, retailer: str):
     """Increment recommended count for a product"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO product_intelligence (product_id, retailer, times_recommended, last_updated)
-            VALUES (?, ?, 1, ?)
-            ON CONFLICT(product_id, retailer) DO UPDATE SET
-                times_recommended = times_recommended + 1,
-                last_updated = ?
-        """, (product_id, retailer, datetime.now().isoformat(), datetime.now().isoformat()))
+    track_event('recommended', product_id, retailer)
 
 
 def track_product_clicked(product_id: str, retailer: str):
     """Increment clicked count and update CTR"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE product_intelligence
-            SET times_clicked = times_clicked + 1,
-                click_through_rate = CAST(times_clicked + 1 AS REAL) / NULLIF(times_recommended, 0),
-                last_updated = ?
-            WHERE product_id = ? AND retailer = ?
-        """, (datetime.now().isoformat(), product_id, retailer))
+    track_event('clicked', product_id, retailer)
 
 
 def track_product_favorited(product_id: str, retailer: str):
     """Increment favorited count"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE product_intelligence
-            SET times_favorited = times_favorited + 1,
-                last_updated = ?
-            WHERE product_id = ? AND retailer = ?
-        """, (datetime.now().isoformat(), product_id, retailer))
+    track_event('favorited', product_id, retailer)
 
 
 # =============================================================================
 # INTEREST INTELLIGENCE (Reuse Analysis)
 # =============================================================================
 
+# Parsed interest_intelligence rows (or None for unknown interests), keyed by
+# (DB_PATH, interest_name). Product scoring looks every profile interest up
+# once per candidate product; the table only changes through the helpers
+# below, which evict their key. Other workers' writes show up within the TTL.
+_interest_intel_cache = {}
+_interest_intel_lock = threading.Lock()
+INTEREST_INTEL_TTL = 60
+
+
+def _evict_interest_intelligence(interest_name: str):
+    with _interest_intel_lock:
+        _interest_intel_cache.pop((DB_PATH, interest_name), None)
+
+
 def get_interest_intelligence(interest_name: str) -> Optional[Dict]:
-    """Get intelligence data for an interest"""
-    with get_db_connection() as conn:
+    """Get intelligence data for an interest (cached for INTEREST_INTEL_TTL seconds)"""
+    key = (DB_PATH, interest_name.lower())
+    now = time.time()
+    with _interest_intel_lock:
+        cached = _interest_intel_cache.get(key)
+    if cached is not None and now - cached[0] < INTEREST_INTEL_TTL:
+        intel = cached[1]
+        # Copy so callers can't mutate the cached dict; the lists are only read
+        return dict(intel) if intel is not None else None
+
+    with get_db_connection(transaction=False) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT * FROM interest_intelligence
             WHERE interest_name = ?
-        """, (interest_name.lower(),))
+        """, (key[1],))
 
         row = cursor.fetchone()
-        if row:
-            intel = dict(row)
-            # Parse JSON fields
-            for field in ['do_buy', 'dont_buy', 'top_products', 'top_brands']:
-                if intel.get(field):
-                    try:
-                        intel[field] = json.loads(intel[field])
-                    except:
-                        intel[field] = []
-            return intel
-        return None
+
+    intel = None
+    if row:
+        intel = dict(row)
+        # Parse JSON fields
+        for field in ['do_buy', 'dont_buy', 'top_products', 'top_brands']:
+            if intel.get(field):
+                try:
+                    intel[field] = _json_loads(intel[field])
+                except:
+                    intel[field] = []
+
+    with _interest_intel_lock:
+        _interest_intel_cache[key] = (now, intel)
+    return dict(intel) if intel is not None else None
 
 
 def upsert_interest_intelligence(interest_name: str, data: Dict):
     """Insert or update interest intelligence"""
+    _evict_interest_intelligence(interest_name.lower())
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
         # Serialize JSON fields
-        do_buy = json.dumps(data.get('do_buy', []))
-        dont_buy = json.dumps(data.get('dont_buy', []))
-        top_products = json.dumps(data.get('top_products', []))
-        top_brands = json.dumps(data.get('top_brands', []))
+        do_buy = _json_dumps(data.get('do_buy', []))
+        dont_buy = _json_dumps(data.get('dont_buy', []))
+        top_products = _json_dumps(data.get('top_products', []))
+        top_brands = _json_dumps(data.get('top_brands', []))
 
-        cursor.execute("""
+        cursor.execute(f"""
             INSERT INTO interest_intelligence (
                 interest_name, do_buy, dont_buy, demographics, trending_level,
                 top_products, top_brands, avg_price_point, times_seen, last_updated
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {SQL_NOW})
             ON CONFLICT(interest_name) DO UPDATE SET
                 do_buy = excluded.do_buy,
                 dont_buy = excluded.dont_buy,
@@ -884,21 +1414,21 @@ def upsert_interest_intelligence(interest_name: str, data: Dict):
             top_brands,
             data.get('avg_price_point', 0.0),
             1,
-            datetime.now().isoformat()
         ))
 
 
 def increment_interest_seen(interest_name: str):
     """Track that we've seen this interest in a profile"""
+    _evict_interest_intelligence(interest_name.lower())
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
             INSERT INTO interest_intelligence (interest_name, times_seen, last_updated)
-            VALUES (?, 1, ?)
+            VALUES (?, 1, {SQL_NOW})
             ON CONFLICT(interest_name) DO UPDATE SET
                 times_seen = times_seen + 1,
-                last_updated = ?
-        """, (interest_name.lower(), datetime.now().isoformat(), datetime.now().isoformat()))
+                last_updated = excluded.last_updated
+        """, (interest_name.lower(),))
 
 
 # =============================================================================
@@ -921,23 +1451,22 @@ def check_and_record_pipeline_run(ip: str) -> tuple:
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
-        # Check existing record
-        cursor.execute("SELECT last_run FROM rate_limits WHERE ip = ?", (ip,))
-        row = cursor.fetchone()
+        # Record the run unless the existing one is inside the window. The
+        # upsert's WHERE skips the update for rate-limited IPs, so RETURNING
+        # yields a row only when the run is allowed — one statement on the
+        # common path instead of SELECT + INSERT.
+        cursor.execute("""
+            INSERT INTO rate_limits (ip, last_run) VALUES (?, ?)
+            ON CONFLICT(ip) DO UPDATE SET last_run = excluded.last_run
+            WHERE last_run <= ?
+            RETURNING last_run
+        """, (ip, now.isoformat(), (now - window).isoformat()))
+        if cursor.fetchone():
+            return True, None
 
-        if row:
-            last_run = datetime.fromisoformat(row['last_run'])
-            elapsed = now - last_run
-            if elapsed < window:
-                reset_time = last_run + window
-                return False, reset_time
-
-        # Allowed — record this run (INSERT OR REPLACE is atomic)
-        cursor.execute(
-            "INSERT OR REPLACE INTO rate_limits (ip, last_run) VALUES (?, ?)",
-            (ip, now.isoformat())
-        )
-        return True, None
+        cursor.execute("SELECT last_run FROM rate_limits WHERE ip = ?", (ip,))
+        last_run = datetime.fromisoformat(cursor.fetchone()['last_run'])
+        return False, last_run + window
 
 
 # =============================================================================
@@ -11,6 +11,8 @@ import logging
 import os
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
@@ -22,8 +24,17 @@ logger = logging.getLogger(__name__)
 # Token cache: reuse until ~5 min before expiry
 _ebay_token = None
 _ebay_token_expires = 0
+_ebay_token_lock = threading.Lock()
 EBAY_TOKEN_BUFFER = 300
 
+# Shared by the token and search calls so they reuse one keep-alive pool to
+# api.ebay.com instead of a fresh TCP+TLS handshake per request.
+_client = APIClient(timeout=15, max_retries=2)
+EBAY_MAX_PARALLEL_QUERIES = 8
+
+# Item conditions that make a poor gift
+_REJECT_CONDITIONS = frozenset({"pre-owned", "used", "for parts or not working", "acceptable"})
+
 BROWSE_SEARCH_URL = "https://api.ebay.com/buy/browse/v1/item_summary/search"
 TOKEN_URL = "https://api.ebay.com/identity/v1/oauth2/token"
 SCOPE = "https://api.ebay.com/oauth/api_scope"
@@ -43,36 +54,39 @@ def _add_affiliate_params(url):
 def _get_app_token(client_id, client_secret):
     """Get or refresh eBay application access token (client credentials grant)."""
     global _ebay_token, _ebay_token_expires
-    now = time.time()
-    if _ebay_token and now < _ebay_token_expires - EBAY_TOKEN_BUFFER:
+    if _ebay_token and time.time() < _ebay_token_expires - EBAY_TOKEN_BUFFER:
         return _ebay_token
 
-    credentials = f"{client_id}:{client_secret}"
-    b64 = base64.b64encode(credentials.encode()).decode()
-
-    # Use APIClient for automatic retry on transient failures
-    client = APIClient(timeout=15, max_retries=2)
-    data = client.post(
-        TOKEN_URL,
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {b64}",
-        },
-        data={
-            "grant_type": "client_credentials",
-            "scope": SCOPE,
-        },
-    )
-
-    if not data:
-        logger.warning("eBay token request failed - no response")
-        return None
-
-    _ebay_token = data.get("access_token")
-    expires_in = int(data.get("expires_in", 7200))
-    _ebay_token_expires = now + expires_in
-    logger.info("eBay app token obtained, expires in %s s", expires_in)
-    return _ebay_token
+    with _ebay_token_lock:
+        # Another request thread may have refreshed it while we waited
+        now = time.time()
+        if _ebay_token and now < _ebay_token_expires - EBAY_TOKEN_BUFFER:
+            return _ebay_token
+
+        credentials = f"{client_id}:{client_secret}"
+        b64 = base64.b64encode(credentials.encode()).decode()
+
+        data = _client.post(
+            TOKEN_URL,
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Authorization": f"Basic {b64}",
+            },
+            data={
+                "grant_type": "client_credentials",
+                "scope": SCOPE,
+            },
+        )
+
+        if not data:
+            logger.warning("eBay token request failed - no response")
+            return None
+
+        _ebay_token = data.get("access_token")
+        expires_in = int(data.get("expires_in", 7200))
+        _ebay_token_expires = now + expires_in
+        logger.info("eBay app token obtained, expires in %s s", expires_in)
+        return _ebay_token
 
 
 def search_products_ebay(profile, client_id, client_secret, target_count=20):
@@ -94,7 +108,7 @@ def search_products_ebay(profile, client_id, client_secret, target_count=20):
     if not interests:
         return []
 
-    search_queries = []
+    queries_by_key = {}
     for interest in interests:
         name = interest.get("name", "")
         if not name:
@@ -107,13 +121,21 @@ def search_products_ebay(profile, client_id, client_secret, target_count=20):
         intensity = interest.get("intensity", "medium")
         query = build_search_query(name, intensity=intensity)
 
-        search_queries.append({
+        priority = "high" if intensity == "passionate" else "medium"
+        logger.debug("eBay query: '%s' → '%s' (intensity: %s)", name, query, intensity)
+        # Interests that build the same query would spend two calls on one
+        # result set; keep the first position, upgrading to high priority.
+        key = query.lower()
+        if key in queries_by_key:
+            if priority == "high":
+                queries_by_key[key]["priority"] = "high"
+            continue
+        queries_by_key[key] = {
             "query": query,
             "interest": name,
-            "priority": "high" if intensity == "passionate" else "medium",
-        })
-        logger.debug("eBay query: '%s' → '%s' (intensity: %s)", name, query, intensity)
-    search_queries = search_queries[:10]
+            "priority": priority,
+        }
+    search_queries = list(queries_by_key.values())[:10]
     if not search_queries:
         return []
 
@@ -121,86 +143,97 @@ def search_products_ebay(profile, client_id, client_secret, target_count=20):
     seen_ids = set()
     per_query = max(3, (target_count // len(search_queries)) + 1)
 
-    # Use APIClient for automatic retry on transient failures
-    client = APIClient(timeout=15, max_retries=2)
-
-    for q in search_queries:
-        if len(all_products) >= target_count:
-            break
-        query = q["query"]
-        interest = q["interest"]
-        priority = q["priority"]
-        # Randomize offset so repeat runs surface different products.
-        # IMPORTANT: eBay requires offset to be a multiple of limit — mismatched
-        # values (e.g. offset=5, limit=3) return 400 Bad Request.
-        limit = min(per_query, 50)
-        params = {
-            "q": query[:100],
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
+    }
+    # Randomize offset so repeat runs surface different products.
+    # IMPORTANT: eBay requires offset to be a multiple of limit — mismatched
+    # values (e.g. offset=5, limit=3) return 400 Bad Request.
+    limit = min(per_query, 50)
+    all_params = [
+        {
+            "q": q["query"][:100],
             "limit": limit,
             "offset": random.choice([0, 0, 0, 0, limit]),
             "filter": "conditionIds:{1000|1500},buyingOptions:{FIXED_PRICE}",  # New/Open Box, BuyItNow only (auctions have no price, bad for gifting)
         }
-
-        data = client.get(
-            BROWSE_SEARCH_URL,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
-            },
-            params=params,
-        )
-
-        if not data:
-            logger.warning("eBay search failed for '%s'", query)
-            continue
-
-        summaries = data.get("itemSummaries") or []
-        for item in summaries:
+        for q in search_queries
+    ]
+
+    # The queries are independent round trips, so run them concurrently on the
+    # shared session. Results are merged in query order, so the merge below
+    # (and which products win dedup) is the same as the old sequential loop.
+    # The target is checked before waiting on each next response, each payload
+    # is released once merged, and queries still queued when the target is
+    # reached are cancelled.
+    executor = ThreadPoolExecutor(max_workers=min(EBAY_MAX_PARALLEL_QUERIES, len(all_params)))
+    futures = [
+        executor.submit(_client.get, BROWSE_SEARCH_URL, headers=headers, params=params)
+        for params in all_params
+    ]
+    try:
+        for i, q in enumerate(search_queries):
             if len(all_products) >= target_count:
                 break
-            item_id = item.get("itemId")
-            if not item_id or item_id in seen_ids:
-                continue
-            title = (item.get("title") or "").strip()
-            if not title:
+            data = futures[i].result()
+            futures[i] = None
+            query = q["query"]
+            interest = q["interest"]
+            priority = q["priority"]
+
+            if not data:
+                logger.warning("eBay search failed for '%s'", query)
                 continue
-            # Skip used/pre-owned items — bad gift quality
-            condition = (item.get("condition") or "").strip()
-            if condition.lower() in ("pre-owned", "used", "for parts or not working", "acceptable"):
-                logger.debug("Skipping used eBay item: %s (%s)", title[:50], condition)
-                continue
-            link = _add_affiliate_params(item.get("itemWebUrl") or "")
-            if not link:
-                continue
-            image_obj = item.get("image") or {}
-            image = image_obj.get("imageUrl", "")
-            price_obj = item.get("price") or {}
-            price_val = price_obj.get("value", "")
-            currency = price_obj.get("currency", "USD")
-            price = f"${price_val}" if price_val else ""
-            short_desc = (item.get("shortDescription") or "").strip()
-            categories = item.get("categories") or []
-            category_name = categories[0].get("categoryName", "") if categories else ""
-            condition = (item.get("condition") or "").strip()
-            snippet_parts = [s for s in [short_desc[:120], category_name, condition] if s]
-            snippet = " | ".join(snippet_parts) if snippet_parts else title[:120]
-
-            product = {
-                "title": title[:200],
-                "link": link,
-                "snippet": snippet,
-                "image": image,
-                "thumbnail": image,
-                "image_url": image,
-                "source_domain": "ebay.com",
-                "search_query": query,
-                "interest_match": interest,
-                "priority": priority,
-                "price": price,
-                "product_id": str(item_id),
-            }
-            seen_ids.add(item_id)
-            all_products.append(product)
+
+            summaries = data.get("itemSummaries") or []
+            for item in summaries:
+                if len(all_products) >= target_count:
+                    break
+                item_id = item.get("itemId")
+                if not item_id or item_id in seen_ids:
+                    continue
+                title = (item.get("title") or "").strip()
+                if not title:
+                    continue
+                # Skip used/pre-owned items — bad gift quality
+                condition = (item.get("condition") or "").strip()
+                if condition.lower() in _REJECT_CONDITIONS:
+                    logger.debug("Skipping used eBay item: %s (%s)", title[:50], condition)
+                    continue
+                link = _add_affiliate_params(item.get("itemWebUrl") or "")
+                if not link:
+                    continue
+                image_obj = item.get("image") or {}
+                image = image_obj.get("imageUrl", "")
+                price_obj = item.get("price") or {}
+                price_val = price_obj.get("value", "")
+                currency = price_obj.get("currency", "USD")
+                price = f"${price_val}" if price_val else ""
+                short_desc = (item.get("shortDescription") or "").strip()
+                categories = item.get("categories") or []
+                category_name = categories[0].get("categoryName", "") if categories else ""
+                snippet_parts = [s for s in [short_desc[:120], category_name, condition] if s]
+                snippet = " | ".join(snippet_parts) if snippet_parts else title[:120]
+
+                product = {
+                    "title": title[:200],
+                    "link": link,
+                    "snippet": snippet,
+                    "image": image,
+                    "thumbnail": image,
+                    "image_url": image,
+                    "source_domain": "ebay.com",
+                    "search_query": query,
+                    "interest_match": interest,
+                    "priority": priority,
+                    "price": price,
+                    "product_id": str(item_id),
+                }
+                seen_ids.add(item_id)
+                all_products.append(product)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
     logger.info("Found %s eBay products", len(all_products))
     return all_products[:target_count]
@@ -12,13 +12,38 @@ Key Improvements:
 """
 
 from collections import Counter, defaultdict
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 import re
+import sys
+
+# Optional: Aho-Corasick automaton for brand matching (pyahocorasick).
+# Falls back to the _BRAND_RE alternation when not installed.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Per-platform Counters that combine_all_signals merges across platforms
+_COMBINED_COUNTERS = ('hashtags', 'brand_mentions', 'activity_types', 'aesthetic_keywords')
+
+
+@dataclass(slots=True, frozen=True)
+class EngagementItem:
+    """A post that out-performed the account's average engagement."""
+    caption: str
+    hashtags: tuple
+    engagement: int
+    ratio_vs_avg: float
+    type: str
 
 # --- Brand detection ---
 # Large but not exhaustive list of brands people commonly reference on social media.
 # Matches are case-insensitive against captions, hashtags, and @mentions.
-_KNOWN_BRANDS = {
+# Interned so every match reuses the one string object per brand.
+_KNOWN_BRANDS = frozenset(map(sys.intern, {
     # Apparel / Athleisure
     'nike', 'adidas', 'puma', 'reebok', 'new balance', 'asics', 'under armour',
     'lululemon', 'athleta', 'fabletics', 'gymshark', 'alo yoga', 'vuori',
@@ -63,17 +88,133 @@ _KNOWN_BRANDS = {
     # Jewelry / Accessories
     'mejuri', 'gorjana', 'kendra scott', 'pandora', 'tiffany',
     'ray ban', 'oakley', 'warby parker',
-}
+}))
 
 # Words that look like @mentions but aren't brands (common personal/generic handles)
-_NON_BRAND_HANDLES = {
+_NON_BRAND_HANDLES = frozenset({
     'me', 'self', 'my', 'repost', 'reels', 'explore', 'trending', 'viral',
     'fyp', 'foryou', 'foryoupage', 'photo', 'photography', 'instagood',
     'love', 'life', 'style', 'beauty', 'fitness', 'food', 'travel',
     'music', 'art', 'design', 'nature', 'fashion', 'home', 'family',
     'friends', 'fun', 'happy', 'beautiful', 'cute', 'goals', 'mood',
     'ootd', 'tbt', 'selfie', 'photooftheday', 'instadaily',
-}
+})
+
+_ACTIVITY_KEYWORDS = (
+    'travel', 'food', 'fitness', 'music', 'art', 'photography',
+    'reading', 'gaming', 'cooking', 'hiking', 'running', 'yoga',
+    'coffee', 'wine', 'beer', 'concert', 'festival', 'museum'
+)
+
+_AESTHETIC_KEYWORDS = (
+    'minimalist', 'vintage', 'aesthetic', 'cozy', 'modern', 'rustic',
+    'boho', 'industrial', 'scandinavian', 'japanese', 'french',
+    'colorful', 'monochrome', 'pastel', 'bold', 'elegant', 'casual'
+)
+
+
+def _alternation(words):
+    """Regex alternation of literal words, longest first so multi-word brands win."""
+    return '|'.join(map(re.escape, sorted(words, key=len, reverse=True)))
+
+
+def _uniq_top(items, n):
+    """First n distinct items, in order of first appearance."""
+    seen = {}
+    for item in items:
+        seen[item] = None
+        if len(seen) >= n:
+            break
+    return list(seen)
+
+
+# One pass per caption instead of a substring scan per keyword. Brands need a
+# word boundary on both sides ("rei" isn't in "their", "apple" isn't "apples");
+# activity/aesthetic keywords only at the start, so "concerts" still counts
+# as "concert" but "party" no longer counts as "art".
+_BRAND_RE = re.compile(r'\b(?:' + _alternation(_KNOWN_BRANDS) + r')\b')
+_ACTIVITY_RE = re.compile(r'\b(?:' + _alternation(_ACTIVITY_KEYWORDS) + r')')
+_AESTHETIC_RE = re.compile(r'\b(?:' + _alternation(_AESTHETIC_KEYWORDS) + r')')
+# Hashtags run words together (#travelgram, #coffeeart), so match anywhere
+_ACTIVITY_TAG_RE = re.compile(_alternation(_ACTIVITY_KEYWORDS))
+
+# Per-post constants, built once at import rather than on every loop pass
+_LOCATION_PATTERNS = ('in', 'at', 'visiting', 'exploring')
+_PRODUCT_INDICATORS = ('bought', 'got', 'new', 'just got', 'purchased', 'ordered')
+_MENTION_RE = re.compile(r'@(\w+)')
+_PRICE_RE = re.compile(r'\$(\d+)')
+_PIN_STOPWORDS = frozenset({'that', 'this', 'with', 'from', 'have', 'been'})
+# Substring matches, as the old `word in text` checks were
+_PIN_WANT_RE = re.compile(_alternation(('want', 'need', 'wish', 'love', 'dream')))
+_PLANNING_RE = re.compile(_alternation(('wedding', 'home', 'decor', 'renovation', 'party', 'event')))
+
+# "Want language" — explicit purchase-intent signals. Instagram records which
+# pattern fired, so it keeps them separate; TikTok only needs any match.
+_IG_WANT_PATTERNS = tuple(re.compile(p) for p in (
+    r'i need (?:this|that|one)',
+    r'someone (?:get|buy) me',
+    r'on my (?:wish ?list|bucket ?list)',
+    r'dream (\w+ ?){1,3}',
+    r'i want (?:this|that|one)',
+    r'(?:birthday|christmas) (?:wish|goal|list)',
+    r'take my money',
+    r'shut up and take',
+    r'adding (?:this|that) to (?:my|the) (?:list|cart)',
+))
+_TT_WANT_RE = re.compile('|'.join((
+    r'i need (?:this|that|one)',
+    r'someone (?:get|buy) me',
+    r'on my (?:wish ?list|bucket ?list)',
+    r'i want (?:this|that|one)',
+    r'take my money',
+    r'adding (?:this|that) to',
+)))
+_TT_REPOST_WANT_RE = re.compile('|'.join((
+    r'i need', r'someone.*buy', r'wish ?list', r'bucket ?list', r'i want', r'take my money',
+)))
+
+if ahocorasick is not None:
+    _BRAND_AC = ahocorasick.Automaton()
+    for _brand in _KNOWN_BRANDS:
+        _BRAND_AC.add_word(_brand, _brand)
+    _BRAND_AC.make_automaton()
+else:
+    _BRAND_AC = None
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _find_brands(text):
+    """
+    Set of known brands mentioned in lowercased text, on word boundaries.
+
+    The automaton finds every occurrence in one pass over the text, regardless
+    of how many brands there are. Overlapping hits are resolved leftmost-longest
+    so both paths agree ("disney plus" is one brand, not also "disney").
+    """
+    if _BRAND_AC is None:
+        # Intern so Counter keys share the _KNOWN_BRANDS objects (the
+        # automaton path below already returns them)
+        return set(map(sys.intern, _BRAND_RE.findall(text)))
+
+    spans = []
+    for end, brand in _BRAND_AC.iter(text):
+        start = end - len(brand) + 1
+        if start > 0 and _is_word_char(text[start - 1]):
+            continue
+        if end + 1 < len(text) and _is_word_char(text[end + 1]):
+            continue
+        spans.append((start, -len(brand), brand))
+
+    found = set()
+    last_end = 0
+    for start, neg_len, brand in sorted(spans):
+        if start >= last_end:
+            found.add(brand)
+            last_end = start - neg_len
+    return found
 
 def extract_all_instagram_signals(ig_data):
     """
@@ -109,6 +250,11 @@ def extract_all_instagram_signals(ig_data):
     all_engagements = [(p.get('likes', 0) + p.get('comments', 0) * 2) for p in posts]
     avg_engagement = sum(all_engagements) / len(all_engagements) if all_engagements else 1
 
+    # One clock read for the whole batch. Aware timestamps are compared in
+    # UTC, naive ones against local time (as datetime.now(None) did).
+    now_utc = datetime.now(timezone.utc)
+    now_local = datetime.now()
+
     # Analyze each post deeply
     for post in posts:
         caption = post.get('caption', '').lower()
@@ -117,13 +263,20 @@ def extract_all_instagram_signals(ig_data):
         timestamp = post.get('timestamp', '')
         hashtags = post.get('hashtags', [])
         post_type = post.get('type', 'image')
+        tags_lower = [tag.lower() for tag in hashtags]
+
+        # Tokenize once; first position of each word for the location and
+        # product-indicator lookups below
+        words = caption.split()
+        word_index = {}
+        for i, word in enumerate(words):
+            word_index.setdefault(word, i)
 
         # Hashtags
-        for tag in hashtags:
-            signals['hashtags'][tag.lower()] += 1
+        signals['hashtags'].update(tags_lower)
 
         # Extract mentions (@username)
-        mentions = re.findall(r'@(\w+)', caption)
+        mentions = _MENTION_RE.findall(caption)
         signals['mentions'].update(mentions)
 
         # Structured location from geotag (much more reliable than caption parsing)
@@ -139,63 +292,46 @@ def extract_all_instagram_signals(ig_data):
 
         # Fallback: extract locations from caption only if no geotag
         if not location:
-            location_patterns = ['in', 'at', 'visiting', 'exploring']
-            for pattern in location_patterns:
-                if pattern in caption:
-                    words = caption.split()
-                    idx = words.index(pattern) if pattern in words else -1
-                    if idx >= 0 and idx < len(words) - 1:
-                        potential_location = words[idx + 1]
-                        if len(potential_location) > 2:
-                            signals['locations'][potential_location] += 1
+            for pattern in _LOCATION_PATTERNS:
+                idx = word_index.get(pattern, -1)
+                if idx >= 0 and idx < len(words) - 1:
+                    potential_location = words[idx + 1]
+                    if len(potential_location) > 2:
+                        signals['locations'][potential_location] += 1
 
         # "Want language" extraction — explicit purchase-intent signals
-        want_patterns = [
-            r'i need (?:this|that|one)',
-            r'someone (?:get|buy) me',
-            r'on my (?:wish ?list|bucket ?list)',
-            r'dream (\w+ ?){1,3}',
-            r'i want (?:this|that|one)',
-            r'(?:birthday|christmas) (?:wish|goal|list)',
-            r'take my money',
-            r'shut up and take',
-            r'adding (?:this|that) to (?:my|the) (?:list|cart)',
-        ]
-        for pattern in want_patterns:
-            if re.search(pattern, caption):
+        for pattern in _IG_WANT_PATTERNS:
+            if pattern.search(caption):
                 # Extract surrounding context (the thing they want)
                 signals['want_signals'].append({
                     'text': caption[:200],
                     'hashtags': hashtags,
-                    'trigger': pattern.split('(')[0].strip('\\')
+                    'trigger': pattern.pattern.split('(')[0].strip('\\')
                 })
                 break  # One match per post is enough
 
         # Engagement analysis — relative to THEIR average, not absolute
         total_engagement = likes + (comments * 2)
         if total_engagement > avg_engagement * 1.5:
-            signals['high_engagement_content'].append({
-                'caption': caption[:200],
-                'hashtags': hashtags,
-                'engagement': total_engagement,
-                'ratio_vs_avg': round(total_engagement / avg_engagement, 1) if avg_engagement > 0 else 0,
-                'type': post_type
-            })
+            signals['high_engagement_content'].append(EngagementItem(
+                caption=caption[:200],
+                hashtags=tuple(hashtags),
+                engagement=total_engagement,
+                ratio_vs_avg=round(total_engagement / avg_engagement, 1) if avg_engagement > 0 else 0,
+                type=post_type,
+            ))
         elif total_engagement < avg_engagement * 0.3:
             signals['low_engagement_content'].append({
                 'caption': caption[:200],
                 'hashtags': hashtags
             })
         
-        # Extract brand mentions from caption text
-        caption_lower = caption.lower()
-        for brand in _KNOWN_BRANDS:
-            if brand in caption_lower:
-                signals['brand_mentions'][brand] += 1
+        # Extract brand mentions from caption text (once per post per brand)
+        signals['brand_mentions'].update(_find_brands(caption))
 
         # @mentions are often brand handles — treat them as brand signals
-        for mention in mentions:
-            m_lower = mention.lower()
+        # (caption is already lowercased, so the handles are too)
+        for m_lower in mentions:
             if m_lower not in _NON_BRAND_HANDLES and len(m_lower) > 2:
                 # Check if it matches a known brand (stripped underscores/dots)
                 clean = m_lower.replace('_', ' ').replace('.', ' ').strip()
@@ -207,49 +343,33 @@ def extract_all_instagram_signals(ig_data):
                     signals['brand_mentions'][m_lower] += 1
 
         # Hashtags can be brand references (#Lululemon, #YetiCoolers)
-        for tag in hashtags:
-            tag_lower = tag.lower().replace('_', ' ')
-            if tag_lower in _KNOWN_BRANDS:
-                signals['brand_mentions'][tag_lower] += 1
+        signals['brand_mentions'].update(
+            tag for tag in (t.replace('_', ' ') for t in tags_lower) if tag in _KNOWN_BRANDS
+        )
         
         # Extract product mentions (common patterns)
-        product_indicators = ['bought', 'got', 'new', 'just got', 'purchased', 'ordered']
-        for indicator in product_indicators:
-            if indicator in caption:
-                # Extract surrounding words as potential product
-                words = caption.split()
-                idx = words.index(indicator) if indicator in words else -1
-                if idx >= 0:
-                    # Get next 2-3 words as potential product
-                    product_words = words[idx+1:idx+4]
-                    if product_words:
-                        signals['product_mentions'][' '.join(product_words)] += 1
+        for indicator in _PRODUCT_INDICATORS:
+            # Extract surrounding words as potential product
+            idx = word_index.get(indicator, -1)
+            if idx >= 0:
+                # Get next 2-3 words as potential product
+                product_words = words[idx+1:idx+4]
+                if product_words:
+                    signals['product_mentions'][' '.join(product_words)] += 1
         
         # Activity types (from hashtags and captions)
-        activity_keywords = [
-            'travel', 'food', 'fitness', 'music', 'art', 'photography',
-            'reading', 'gaming', 'cooking', 'hiking', 'running', 'yoga',
-            'coffee', 'wine', 'beer', 'concert', 'festival', 'museum'
-        ]
-        for keyword in activity_keywords:
-            if keyword in caption or any(keyword in tag.lower() for tag in hashtags):
-                signals['activity_types'][keyword] += 1
-        
+        activities = set(_ACTIVITY_RE.findall(caption))
+        activities.update(_ACTIVITY_TAG_RE.findall(' '.join(tags_lower)))
+        signals['activity_types'].update(activities)
+
         # Aesthetic keywords
-        aesthetic_keywords = [
-            'minimalist', 'vintage', 'aesthetic', 'cozy', 'modern', 'rustic',
-            'boho', 'industrial', 'scandinavian', 'japanese', 'french',
-            'colorful', 'monochrome', 'pastel', 'bold', 'elegant', 'casual'
-        ]
-        for keyword in aesthetic_keywords:
-            if keyword in caption:
-                signals['aesthetic_keywords'][keyword] += 1
+        signals['aesthetic_keywords'].update(set(_AESTHETIC_RE.findall(caption)))
         
         # Temporal analysis (if timestamp available)
         if timestamp:
             try:
                 post_date = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                days_ago = (datetime.now(post_date.tzinfo) - post_date).days
+                days_ago = ((now_utc if post_date.tzinfo else now_local) - post_date).days
                 
                 # Recent interests (last 30 days)
                 if days_ago <= 30:
@@ -257,9 +377,13 @@ def extract_all_instagram_signals(ig_data):
                 
                 # Declining interests (old posts with high engagement, but no recent posts)
                 # This would need comparison across posts
-            except:
+            except (ValueError, TypeError, AttributeError):
                 pass
     
+    # Keep the untruncated counts for combine_all_signals, so cross-platform
+    # totals are ranked before any per-platform top-k cut
+    signals['_raw'] = {key: signals[key] for key in _COMBINED_COUNTERS}
+
     # Convert counters to dicts
     signals['hashtags'] = dict(signals['hashtags'].most_common(50))
     signals['mentions'] = dict(signals['mentions'].most_common(20))
@@ -270,7 +394,7 @@ def extract_all_instagram_signals(ig_data):
     signals['aesthetic_keywords'] = dict(signals['aesthetic_keywords'].most_common(15))
 
     # Recent interests (last 30 days)
-    signals['recent_interests'] = list(set(signals['recent_interests']))[:20]
+    signals['recent_interests'] = _uniq_top(signals['recent_interests'], 20)
 
     # Want signals (cap at 10, sorted by most recent)
     signals['want_signals'] = signals['want_signals'][:10]
@@ -309,22 +433,19 @@ def extract_all_tiktok_signals(tt_data):
         likes = video.get('likes', 0)
         comments = video.get('comments', 0)
         shares = video.get('shares', 0)
+        tags_lower = [tag.lower() for tag in hashtags]
 
         # Hashtags
-        signals['hashtags'].update([tag.lower() for tag in hashtags])
+        signals['hashtags'].update(tags_lower)
 
         # Brand mentions from description and hashtags
-        for brand in _KNOWN_BRANDS:
-            if brand in description:
-                signals['brand_mentions'][brand] += 1
-        for tag in hashtags:
-            tag_lower = tag.lower().replace('_', ' ')
-            if tag_lower in _KNOWN_BRANDS:
-                signals['brand_mentions'][tag_lower] += 1
+        signals['brand_mentions'].update(_find_brands(description))
+        signals['brand_mentions'].update(
+            tag for tag in (t.replace('_', ' ') for t in tags_lower) if tag in _KNOWN_BRANDS
+        )
         # @mentions in TikTok descriptions
-        tt_mentions = re.findall(r'@(\w+)', description)
-        for m in tt_mentions:
-            m_lower = m.lower()
+        tt_mentions = _MENTION_RE.findall(description)
+        for m_lower in tt_mentions:
             if m_lower not in _NON_BRAND_HANDLES and len(m_lower) > 2:
                 clean = m_lower.replace('_', ' ')
                 if clean in _KNOWN_BRANDS:
@@ -333,22 +454,12 @@ def extract_all_tiktok_signals(tt_data):
                     signals['brand_mentions'][m_lower] += 1
 
         # "Want language" extraction — explicit purchase-intent signals
-        want_patterns = [
-            r'i need (?:this|that|one)',
-            r'someone (?:get|buy) me',
-            r'on my (?:wish ?list|bucket ?list)',
-            r'i want (?:this|that|one)',
-            r'take my money',
-            r'adding (?:this|that) to',
-        ]
-        for pattern in want_patterns:
-            if re.search(pattern, description):
-                signals['want_signals'].append({
-                    'text': description[:200],
-                    'hashtags': hashtags,
-                    'source': 'tiktok_video'
-                })
-                break
+        if _TT_WANT_RE.search(description):
+            signals['want_signals'].append({
+                'text': description[:200],
+                'hashtags': hashtags,
+                'source': 'tiktok_video'
+            })
 
         # Music trends
         if music:
@@ -368,20 +479,15 @@ def extract_all_tiktok_signals(tt_data):
         signals['aspirational_content'].append(description[:100])
 
         # Want language in reposts is VERY strong (they reposted AND it has want language)
-        want_patterns = [r'i need', r'someone.*buy', r'wish ?list', r'bucket ?list', r'i want', r'take my money']
-        for pattern in want_patterns:
-            if re.search(pattern, description):
-                signals['want_signals'].append({
-                    'text': description[:200],
-                    'hashtags': hashtags,
-                    'source': 'tiktok_repost'  # Repost + want language = very strong
-                })
-                break
+        if _TT_REPOST_WANT_RE.search(description):
+            signals['want_signals'].append({
+                'text': description[:200],
+                'hashtags': hashtags,
+                'source': 'tiktok_repost'  # Repost + want language = very strong
+            })
 
         # Brand mentions in reposts
-        for brand in _KNOWN_BRANDS:
-            if brand in description:
-                signals['brand_mentions'][brand] += 1
+        signals['brand_mentions'].update(_find_brands(description))
     
     # Favorite creators analysis
     favorite_creators = tt_data.get('favorite_creators', [])
@@ -392,13 +498,15 @@ def extract_all_tiktok_signals(tt_data):
             'significance': 'high' if count > 5 else 'medium'
         })
     
+    signals['_raw'] = {key: signals[key] for key in _COMBINED_COUNTERS if key in signals}
+
     # Convert to dicts
     signals['hashtags'] = dict(signals['hashtags'].most_common(50))
     signals['music_trends'] = dict(signals['music_trends'].most_common(20))
     signals['brand_mentions'] = dict(signals['brand_mentions'].most_common(15))
-    signals['trending_topics'] = list(set(signals['trending_topics']))[:20]
-    signals['aspirational_content'] = list(set(signals['aspirational_content']))[:30]
-    signals['current_interests'] = list(set(signals['current_interests']))[:20]
+    signals['trending_topics'] = _uniq_top(signals['trending_topics'], 20)
+    signals['aspirational_content'] = _uniq_top(signals['aspirational_content'], 30)
+    signals['current_interests'] = _uniq_top(signals['current_interests'], 20)
     signals['want_signals'] = signals['want_signals'][:10]
 
     return signals
@@ -437,28 +545,26 @@ def extract_all_pinterest_signals(pinterest_data):
             
             # Extract keywords
             all_text = f"{title} {pin_description}"
-            words = all_text.split()
-            # Filter meaningful words (length > 3, not common words)
-            meaningful_words = [w for w in words if len(w) > 3 and w not in ['that', 'this', 'with', 'from', 'have', 'been']]
-            signals['pin_keywords'].update(meaningful_words)
+            # Meaningful words only (length > 3, not common words)
+            signals['pin_keywords'].update(
+                w for w in all_text.split() if len(w) > 3 and w not in _PIN_STOPWORDS
+            )
             
             # Extract specific wants (product names, brands)
-            if any(word in all_text for word in ['want', 'need', 'wish', 'love', 'dream']):
+            if _PIN_WANT_RE.search(all_text):
                 signals['specific_wants'].append(title[:100])
             
             # Extract price mentions
-            price_patterns = re.findall(r'\$(\d+)', all_text)
-            signals['price_ranges'].extend([int(p) for p in price_patterns])
+            signals['price_ranges'].extend(int(p) for p in _PRICE_RE.findall(all_text))
         
         # Planning mindset indicators
-        planning_keywords = ['wedding', 'home', 'decor', 'renovation', 'party', 'event']
-        if any(keyword in board_name or keyword in description for keyword in planning_keywords):
+        if _PLANNING_RE.search(board_name) or _PLANNING_RE.search(description):
             signals['planning_mindset'] = True
     
     # Convert to dicts
     signals['board_themes'] = dict(signals['board_themes'].most_common(20))
     signals['pin_keywords'] = dict(signals['pin_keywords'].most_common(50))
-    signals['aspirational_categories'] = list(set([b['name'] for b in boards]))[:15]
+    signals['aspirational_categories'] = _uniq_top((b['name'] for b in boards), 15)
     
     # Price range analysis
     if signals['price_ranges']:
@@ -511,25 +617,24 @@ def combine_all_signals(platform_data):
         'cross_platform_confirmed': [],  # Interests appearing on 2+ platforms
     }
 
+    # Merge the untruncated per-platform counts; the only top-k cut happens
+    # once, below
+    ig_raw = all_signals['instagram'].pop('_raw', {})
+    tt_raw = all_signals['tiktok'].pop('_raw', {})
+
     # Combine hashtags
-    if all_signals['instagram'].get('hashtags'):
-        combined['all_hashtags'].update(all_signals['instagram']['hashtags'])
-    if all_signals['tiktok'].get('hashtags'):
-        combined['all_hashtags'].update(all_signals['tiktok']['hashtags'])
+    combined['all_hashtags'].update(ig_raw.get('hashtags', ()))
+    combined['all_hashtags'].update(tt_raw.get('hashtags', ()))
 
     # Combine brands (from all platforms)
-    if all_signals['instagram'].get('brand_mentions'):
-        combined['all_brands'].update(all_signals['instagram']['brand_mentions'])
-    if all_signals['tiktok'].get('brand_mentions'):
-        combined['all_brands'].update(all_signals['tiktok']['brand_mentions'])
+    combined['all_brands'].update(ig_raw.get('brand_mentions', ()))
+    combined['all_brands'].update(tt_raw.get('brand_mentions', ()))
 
     # Combine activities
-    if all_signals['instagram'].get('activity_types'):
-        combined['all_activities'].update(all_signals['instagram']['activity_types'])
+    combined['all_activities'].update(ig_raw.get('activity_types', ()))
 
     # Combine aesthetics
-    if all_signals['instagram'].get('aesthetic_keywords'):
-        combined['all_aesthetics'].update(all_signals['instagram']['aesthetic_keywords'])
+    combined['all_aesthetics'].update(ig_raw.get('aesthetic_keywords', ()))
 
     # Aspirational interests
     if all_signals['tiktok'].get('aspirational_content'):
@@ -544,9 +649,9 @@ def combine_all_signals(platform_data):
         combined['current_interests'].extend(all_signals['instagram']['recent_interests'])
 
     # High engagement topics
-    if all_signals['instagram'].get('high_engagement_content'):
-        for content in all_signals['instagram']['high_engagement_content']:
-            combined['high_engagement_topics'].extend(content.get('hashtags', []))
+    combined['high_engagement_topics'].extend(chain.from_iterable(
+        item.hashtags for item in all_signals['instagram'].get('high_engagement_content', ())
+    ))
 
     # Price preferences
     if all_signals['pinterest'].get('price_preferences'):
@@ -582,9 +687,9 @@ def combine_all_signals(platform_data):
     combined['all_brands'] = dict(combined['all_brands'].most_common(15))
     combined['all_activities'] = dict(combined['all_activities'].most_common(20))
     combined['all_aesthetics'] = dict(combined['all_aesthetics'].most_common(15))
-    combined['aspirational_interests'] = list(set(combined['aspirational_interests']))[:30]
-    combined['current_interests'] = list(set(combined['current_interests']))[:20]
-    combined['high_engagement_topics'] = list(set(combined['high_engagement_topics']))[:20]
+    combined['aspirational_interests'] = _uniq_top(combined['aspirational_interests'], 30)
+    combined['current_interests'] = _uniq_top(combined['current_interests'], 20)
+    combined['high_engagement_topics'] = _uniq_top(combined['high_engagement_topics'], 20)
     combined['want_signals'] = combined['want_signals'][:15]
 
     all_signals['combined'] = combined
@@ -524,6 +524,16 @@ if ANTHROPIC_API_KEY:
 else:
     logger.warning("ANTHROPIC_API_KEY not set - recommendation generation will fail")
 
+@app.after_request
+def flush_tracking_events(response):
+    """Write queued click/favorite/recommendation counters once they're a few seconds old."""
+    try:
+        from database import flush_tracked_events_if_due
+        flush_tracked_events_if_due()
+    except Exception as e:
+        logger.error(f"Failed to flush tracking events: {e}")
+    return response
+
 # ============================================================================
 # TEMPLATE CONTEXT — makes config values available to all templates
 # ============================================================================
@@ -1500,9 +1510,10 @@ def debug_awin():
         output.append("Setting r.raw.decode_content = True (required for gzip)...\n")
         r.raw.decode_content = True
 
-        output.append("Wrapping in TextIOWrapper and reading CSV...\n")
-        text_stream = io.TextIOWrapper(r.raw, encoding="utf-8", errors="replace")
-        reader = csv.DictReader(text_stream)
+        output.append("Reading lines (128 KB chunks) and decoding CSV...\n")
+        lines = (b.decode("utf-8", "replace")
+                 for b in r.iter_lines(chunk_size=128 * 1024, decode_unicode=False))
+        reader = csv.DictReader(lines)
 
         rows_read = 0
         for i, row in enumerate(reader):
@@ -1514,10 +1525,6 @@ def debug_awin():
                 break
 
         output.append(f"Successfully read {rows_read} rows via streaming\n")
-        try:
-            text_stream.close()
-        except Exception:
-            pass
         try:
             r.close()
         except Exception:
@@ -88,6 +88,21 @@ COMMISSION_RATES = {
 }
 
 
+# =============================================================================
+# FALLBACK PRODUCT IDS
+# =============================================================================
+
+def fallback_product_id(title: str, link: str) -> str:
+    """
+    Stable 16-hex-char ID for feed rows that ship without a product ID.
+
+    blake2b over title and link joined by a NUL, so the ID is the same in
+    every process and on every host (unlike the salted built-in hash()), and
+    swapping title and link gives a different ID.
+    """
+    return hashlib.blake2b(f"{title}\0{link}".encode(), digest_size=8).hexdigest()
+
+
 # =============================================================================
 # PRODUCT SCHEMA
 # =============================================================================
@@ -369,22 +369,28 @@ def backfill_interest_tags(
     try:
         conn = sqlite3.connect(db_path, timeout=15)
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # one commit per batch; no fsync each under WAL
         cur = conn.cursor()
 
-        offset = 0
+        # Keyset pagination: each batch seeks past the last rowid seen instead
+        # of re-walking every earlier row the way OFFSET does.
+        last_rowid = 0
         while True:
             cur.execute("""
                 SELECT rowid, title, description, interest_tags
                 FROM   products
                 WHERE  removed_at IS NULL
                   AND  in_stock = 1
+                  AND  rowid > ?
                 ORDER  BY rowid
-                LIMIT  ? OFFSET ?
-            """, (batch_size, offset))
+                LIMIT  ?
+            """, (last_rowid, batch_size))
 
             rows = cur.fetchall()
             if not rows:
                 break
+            last_rowid = rows[-1]['rowid']
 
             batch_updates = []
             for row in rows:
@@ -422,8 +428,6 @@ def backfill_interest_tags(
                 """, batch_updates)
                 conn.commit()
 
-            offset += batch_size
-
         conn.close()
 
     except Exception as e:
@@ -146,13 +146,17 @@ def refresh_amazon(interests: List[str], max_products: int = 500) -> int:
             )
 
             # Convert and upsert products
+            batch = []
             for result in results:
                 try:
                     product = Product.from_searcher_dict(result, retailer='amazon')
-                    database.upsert_product(product.to_db_format())
-                    products_added += 1
+                    batch.append(product.to_db_format())
                 except Exception as e:
-                    logger.error(f"Failed to upsert Amazon product: {e}")
+                    logger.error(f"Failed to convert Amazon product: {e}")
+            try:
+                products_added += database.upsert_products_bulk(batch)
+            except Exception as e:
+                logger.error(f"Failed to upsert Amazon products: {e}")
 
         logger.info(f"Amazon refresh complete: {products_added} products")
         return products_added
@@ -199,13 +203,17 @@ def refresh_ebay(interests: List[str], max_products: int = 500) -> int:
                 enhanced_search_terms=[interest]
             )
 
+            batch = []
             for result in results:
                 try:
                     product = Product.from_searcher_dict(result, retailer='ebay')
-                    database.upsert_product(product.to_db_format())
-                    products_added += 1
+                    batch.append(product.to_db_format())
                 except Exception as e:
-                    logger.error(f"Failed to upsert eBay product: {e}")
+                    logger.error(f"Failed to convert eBay product: {e}")
+            try:
+                products_added += database.upsert_products_bulk(batch)
+            except Exception as e:
+                logger.error(f"Failed to upsert eBay products: {e}")
 
         logger.info(f"eBay refresh complete: {products_added} products")
         return products_added
@@ -252,13 +260,17 @@ def refresh_etsy(interests: List[str], max_products: int = 500) -> int:
                 enhanced_search_terms=[interest]
             )
 
+            batch = []
             for result in results:
                 try:
                     product = Product.from_searcher_dict(result, retailer='etsy')
-                    database.upsert_product(product.to_db_format())
-                    products_added += 1
+                    batch.append(product.to_db_format())
                 except Exception as e:
-                    logger.error(f"Failed to upsert Etsy product: {e}")
+                    logger.error(f"Failed to convert Etsy product: {e}")
+            try:
+                products_added += database.upsert_products_bulk(batch)
+            except Exception as e:
+                logger.error(f"Failed to upsert Etsy products: {e}")
 
         logger.info(f"Etsy refresh complete: {products_added} products")
         return products_added
@@ -306,13 +318,17 @@ def refresh_awin(interests: List[str], max_products: int = 500) -> int:
                 enhanced_search_terms=[interest]
             )
 
+            batch = []
             for result in results:
                 try:
                     product = Product.from_searcher_dict(result, retailer='awin')
-                    database.upsert_product(product.to_db_format())
-                    products_added += 1
+                    batch.append(product.to_db_format())
                 except Exception as e:
-                    logger.error(f"Failed to upsert Awin product: {e}")
+                    logger.error(f"Failed to convert Awin product: {e}")
+            try:
+                products_added += database.upsert_products_bulk(batch)
+            except Exception as e:
+                logger.error(f"Failed to upsert Awin products: {e}")
 
         logger.info(f"Awin refresh complete: {products_added} products")
         return products_added
@@ -362,13 +378,17 @@ def refresh_cj(interests: List[str], max_products: int = 500) -> int:
                 joined_only=False  # Search all advertisers (not just joined)
             )
 
+            batch = []
             for result in results:
                 try:
                     product = Product.from_searcher_dict(result, retailer='cj')
-                    database.upsert_product(product.to_db_format())
-                    products_added += 1
+                    batch.append(product.to_db_format())
                 except Exception as e:
-                    logger.error(f"Failed to upsert CJ product: {e}")
+                    logger.error(f"Failed to convert CJ product: {e}")
+            try:
+                products_added += database.upsert_products_bulk(batch)
+            except Exception as e:
+                logger.error(f"Failed to upsert CJ products: {e}")
 
         logger.info(f"CJ refresh complete: {products_added} products")
         return products_added
@@ -455,6 +475,10 @@ def refresh_all_products(interests: Optional[List[str]] = None) -> Dict[str, int
     # Clean expired profile caches
     expired_profiles = database.clean_expired_profiles()
 
+    # Refresh planner stats only. The ANALYZE + VACUUM pass locks out the web
+    # workers, so it runs from --maintenance in a maintenance window instead.
+    database.run_maintenance(full=False)
+
     # Update metadata
     database.set_metadata('last_refresh', datetime.now().isoformat())
     database.set_metadata('last_refresh_results', str(results))
@@ -497,10 +521,18 @@ if __name__ == "__main__":
         default=500,
         help='Maximum products per retailer (default: 500)'
     )
+    parser.add_argument(
+        '--maintenance',
+        action='store_true',
+        help='Only run ANALYZE + VACUUM (if due); locks the DB, use in a maintenance window'
+    )
 
     args = parser.parse_args()
 
-    if args.retailer == 'all':
+    if args.maintenance:
+        ran = database.run_maintenance()
+        print(f"Maintenance: {'ANALYZE + VACUUM done' if ran else 'not due, ran PRAGMA optimize only'}")
+    elif args.retailer == 'all':
         refresh_all_products()
     else:
         count = refresh_retailer(args.retailer, max_products=args.max_products)
@@ -266,7 +266,6 @@ def build_recipient_profile(platforms, recipient_type, relationship, claude_clie
     try:
         import config
         import database
-        import hashlib
 
         if config.FEATURES.get('profile_caching', True):
             # Generate hash from platform data for cache lookup.
@@ -284,7 +283,7 @@ def build_recipient_profile(platforms, recipient_type, relationship, claude_clie
                 '_prompt_version': _PROMPT_VERSION,
             }
             cache_str = json.dumps(cache_data, sort_keys=True)
-            profile_hash = hashlib.sha256(cache_str.encode()).hexdigest()
+            profile_hash = database.hash_profile(cache_str.encode())
 
             # Check cache for existing profile
             cached_profile = database.get_cached_profile(profile_hash)
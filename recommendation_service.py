@@ -893,6 +893,9 @@ class RecommendationService:
                 retailer = gift.get('source_domain', '') or gift.get('retailer', '')
                 if product_id and retailer:
                     self.track_curation_outcome({'product_id': product_id, 'retailer': retailer}, 'recommended')
+            # Runs in the pipeline thread, outside any request's after_request flush
+            import database
+            database.flush_tracked_events()
         except Exception as e:
             logger.error(f"Failed to track recommended products: {e}")
 
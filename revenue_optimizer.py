@@ -19,6 +19,11 @@ import re
 from typing import List, Dict, Optional
 from collections import defaultdict
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger('giftwise')
 
 # Commission rates by retailer (approximate)
@@ -97,8 +102,8 @@ def score_product_for_profile(product: Dict, profile: Dict, relationship: str):
     parsed_tags = []
     if isinstance(raw_tags, str) and raw_tags:
         try:
-            parsed_tags = [t.lower().strip() for t in json.loads(raw_tags) if isinstance(t, str)]
-        except (json.JSONDecodeError, TypeError):
+            parsed_tags = [t.lower().strip() for t in _json_loads(raw_tags) if isinstance(t, str)]
+        except (ValueError, TypeError):
             parsed_tags = []
     elif isinstance(raw_tags, list):
         parsed_tags = [str(t).lower().strip() for t in raw_tags]
@@ -0,0 +1,56 @@
+"""
+Tests for the Awin feed row prefilter (awin_searcher._iter_candidate_rows).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from awin_searcher import MAX_ROWS_TO_SCAN_PER_FEED, _iter_candidate_rows, _prepare_queries
+
+
+def _feed(titles):
+    lines = ["product_name,aw_deep_link"]
+    lines += [f"{t},https://example.com/{i}" for i, t in enumerate(titles)]
+    # Trailing partial line, as a cut-off buffered download leaves
+    return ("\n".join(lines) + "\npartial").encode()
+
+
+PREPARED = _prepare_queries([{"query": "hiking backpack"}])
+
+
+class TestIterCandidateRows:
+    def test_stops_at_scan_cap_without_matches(self):
+        stats = {"scanned": 0}
+        rows = list(_iter_candidate_rows(_feed(["plain mug"] * 5000), PREPARED, stats))
+        assert rows == []
+        assert stats["scanned"] == MAX_ROWS_TO_SCAN_PER_FEED
+
+    def test_rows_past_the_cap_are_not_yielded(self):
+        titles = ["plain mug"] * 5000
+        titles[10] = titles[4000] = "hiking backpack"
+        stats = {"scanned": 0}
+        rows = list(_iter_candidate_rows(_feed(titles), PREPARED, stats))
+        assert [r["aw_deep_link"] for r in rows] == ["https://example.com/10"]
+
+    def test_csv_fallback_respects_the_cap(self):
+        # A quoted field spanning lines forces the csv.DictReader path
+        titles = ['"multi\nline"'] + ["plain mug"] * 5000
+        stats = {"scanned": 0}
+        list(_iter_candidate_rows(_feed(titles), PREPARED, stats))
+        assert stats["scanned"] == MAX_ROWS_TO_SCAN_PER_FEED
+
+    def test_truncated_trailing_record_is_dropped(self):
+        data = b"product_name,aw_deep_link\nhiking backpack,https://exa"
+        rows = list(_iter_candidate_rows(data, PREPARED, {"scanned": 0}, truncated=True))
+        assert rows == []
+
+    def test_truncated_trailing_record_is_dropped_by_csv_fallback(self):
+        data = b'product_name,aw_deep_link\n"multi\nline",x\nhiking backpack,https://exa'
+        rows = list(_iter_candidate_rows(data, PREPARED, {"scanned": 0}, truncated=True))
+        assert [r["product_name"] for r in rows] == ["multi\nline"]
+
+    def test_complete_final_record_without_newline_is_kept(self):
+        data = b"product_name,aw_deep_link\nhiking backpack,https://example.com/0"
+        rows = list(_iter_candidate_rows(data, PREPARED, {"scanned": 0}))
+        assert [r["aw_deep_link"] for r in rows] == ["https://example.com/0"]
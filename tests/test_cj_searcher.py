@@ -0,0 +1,93 @@
+"""
+Tests for the live CJ GraphQL search path in cj_searcher.search_products_cj.
+
+requests.post is stubbed, so no network access is needed.
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import cj_searcher
+
+
+class _FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ''
+        self.content = b'{"data": {"products": {"resultList": []}}}'
+
+
+@pytest.fixture
+def live_cj(monkeypatch):
+    """Stub the CJ endpoint; returns the list of keyword lists requested."""
+    calls = []
+    lock = threading.Lock()
+    status = {'code': 200}
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        term = json['query'].split('keywords: ["', 1)[1].split('"', 1)[0]
+        with lock:
+            calls.append(term)
+        return _FakeResponse(status['code'])
+
+    def fake_parse(data, search_term):
+        return [{'product_id': f'{search_term}-{i}', 'search_query': search_term,
+                 'interest_match': search_term} for i in range(3)]
+
+    monkeypatch.setattr(cj_searcher.requests, 'post', fake_post)
+    monkeypatch.setattr(cj_searcher, '_parse_graphql_response', fake_parse)
+    monkeypatch.setattr(cj_searcher, 'is_term_cache_fresh', lambda term: False)
+    monkeypatch.setattr(cj_searcher, 'rate_limiter', cj_searcher.CJRateLimiter())
+    return calls, status
+
+
+def _search(terms, target_count=100):
+    profile = {'interests': [{'name': t} for t in terms]}
+    return cj_searcher.search_products_cj(
+        profile, 'key', company_id='1', publisher_id='2',
+        target_count=target_count, enhanced_search_terms=terms,
+    )
+
+
+class TestLiveSearch:
+    def test_one_request_per_term_merged_in_term_order(self, live_cj):
+        calls, _ = live_cj
+        terms = ['hiking', 'coffee', 'yoga']
+        products = _search(terms)
+
+        assert sorted(calls) == sorted(terms)
+        live = [p for p in products if p['product_id'].split('-')[0] in terms]
+        assert [p['search_query'] for p in live] == [t for t in terms for _ in range(3)]
+
+    def test_auth_failure_returns_nothing(self, live_cj):
+        _, status = live_cj
+        status['code'] = 401
+        assert _search(['hiking', 'coffee']) == []
+
+    def test_stops_sending_waves_once_target_is_met(self, live_cj, monkeypatch):
+        calls, _ = live_cj
+        monkeypatch.setattr(cj_searcher, 'CJ_MAX_PARALLEL_SEARCHES', 2)
+        _search(['hiking', 'coffee', 'yoga', 'chess'], target_count=5)
+
+        assert sorted(calls) == ['coffee', 'hiking']
+
+
+class TestRateLimiter:
+    def test_sleeps_outside_the_lock_when_full(self, monkeypatch):
+        limiter = cj_searcher.CJRateLimiter(max_requests=1, time_window=60)
+        sleeps = []
+
+        def fake_sleep(seconds):
+            assert not limiter._lock.locked()
+            sleeps.append(seconds)
+
+        monkeypatch.setattr(cj_searcher.time, 'sleep', fake_sleep)
+        limiter.wait_if_needed()
+        limiter.wait_if_needed()
+
+        assert len(sleeps) == 1 and 0 < sleeps[0] <= 60
+        assert len(limiter.requests) == 1
@@ -0,0 +1,319 @@
+"""
+Tests for database.py — SQLite catalog, profile cache, and intelligence tracking.
+
+Each test points database.DB_PATH at a fresh temp file; the pooled connection
+is keyed on DB_PATH, so the next helper call opens a connection to it.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import database
+
+
+H1 = database.hash_profile(b"h1")
+OLD = database.hash_profile(b"old")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "products.db"))
+    monkeypatch.setattr(database, "_event_queue", database.defaultdict(int))
+    monkeypatch.setattr(database, "_profile_lru", database.OrderedDict())
+    database.init_database()
+    return database
+
+
+def make_product(product_id="p1", retailer="cj", title="Fly Fishing Reel", tags=("fly fishing",), **extra):
+    product = {
+        "product_id": product_id,
+        "retailer": retailer,
+        "title": title,
+        "description": "A reel",
+        "price": 49.0,
+        "image_url": "https://img.example.com/reel.jpg",
+        "affiliate_link": f"https://example.com/{product_id}",
+        "brand": "Orvis",
+        "interest_tags": list(tags),
+    }
+    product.update(extra)
+    return product
+
+
+# ---------------------------------------------------------------------------
+# Connection handling
+# ---------------------------------------------------------------------------
+
+class TestConnection:
+    def test_connection_reused_within_thread(self, db):
+        with db.get_db_connection() as first:
+            pass
+        with db.get_db_connection() as second:
+            pass
+        assert first is second
+
+    def test_init_records_schema_version(self, db):
+        with db.get_db_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+        db.init_database()  # already current: skips the DDL
+
+    def test_reinit_retries_failed_seed(self, db):
+        with db.get_db_connection() as conn:
+            conn.execute("DELETE FROM interest_intelligence")
+        db.init_database()
+        with db.get_db_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM interest_intelligence").fetchone()[0] > 0
+
+    def test_error_rolls_back(self, db):
+        with pytest.raises(RuntimeError):
+            with db.get_db_connection() as conn:
+                conn.execute(
+                    "INSERT INTO database_metadata (key, value) VALUES ('k', 'v')"
+                )
+                raise RuntimeError("boom")
+        with db.get_db_connection() as conn:
+            row = conn.execute("SELECT value FROM database_metadata WHERE key = 'k'").fetchone()
+        assert row is None
+
+    def test_nested_use_joins_outer_transaction(self, db):
+        with db.get_db_connection() as outer:
+            outer.execute("INSERT INTO database_metadata (key, value) VALUES ('a', '1')")
+            db.set_metadata("b", "2")
+        with db.get_db_connection() as conn:
+            keys = {r["key"] for r in conn.execute("SELECT key FROM database_metadata")}
+        assert {"a", "b"} <= keys
+
+
+# ---------------------------------------------------------------------------
+# Products
+# ---------------------------------------------------------------------------
+
+class TestProducts:
+    def test_upsert_then_search_by_interest(self, db):
+        db.upsert_product(make_product())
+        results = db.search_products_by_interests(["fly fishing"])
+        assert [r["product_id"] for r in results] == ["p1"]
+
+    def test_upsert_updates_existing_row(self, db):
+        first_id = db.upsert_product(make_product(price=49.0))
+        db.upsert_product(make_product("p2"))
+        assert db.upsert_product(make_product(price=39.0)) == first_id
+        results = db.search_products_by_interests(["fly fishing"])
+        assert len(results) == 2
+        assert {r["id"]: r["price"] for r in results}[first_id] == 39.0
+
+    def test_bulk_upsert_writes_all_rows(self, db):
+        products = [make_product(product_id=f"p{i}") for i in range(5)]
+        assert db.upsert_products_bulk(products) == 5
+        assert db.get_total_product_count() == 5
+
+    def test_bulk_upsert_spans_statements_and_repeats(self, db):
+        products = [make_product(f"p{i}") for i in range(200)]
+        products.append(make_product("p0", title="Renamed Reel"))
+        assert db.upsert_products_bulk(products, batch_size=50) == 201
+        assert db.get_total_product_count() == 200
+        titles = {p["product_id"]: p["title"] for p in db.get_products_by_retailer("cj")}
+        assert titles["p0"] == "Renamed Reel"
+
+    def test_mark_stale_by_ids(self, db):
+        db.upsert_products_bulk([make_product("p1"), make_product("p2"), make_product("p3")])
+        assert db.mark_stale_products_by_ids([("p1", "cj"), ("p3", "cj"), ("p9", "cj")]) == 2
+        assert db.mark_stale_products_by_ids([("p1", "cj")]) == 0
+        with db.get_db_connection() as conn:
+            live = [r[0] for r in conn.execute("SELECT product_id FROM products WHERE removed_at IS NULL")]
+        assert live == ["p2"]
+
+    def test_bulk_upsert_empty_is_noop(self, db):
+        assert db.upsert_products_bulk([]) == 0
+
+    def test_database_stats(self, db, monkeypatch):
+        monkeypatch.setattr(db, "_stats_cache", {})
+        db.upsert_products_bulk([
+            make_product("p1", retailer="cj", brand="Orvis"),
+            make_product("p2", retailer="cj", brand="Orvis"),
+            make_product("p3", retailer="awin", brand=None),
+        ])
+        stats = db.get_database_stats()
+        assert stats["total_products"] == 3
+        assert stats["by_retailer"] == {"cj": 2, "awin": 1}
+        assert stats["top_brands"] == [{"brand": "Orvis", "count": 2}]
+        assert stats["last_refresh"] == "Never"
+
+# ---------------------------------------------------------------------------
+# Interest search
+# ---------------------------------------------------------------------------
+
+class TestInterestSearch:
+    def test_tag_and_title_matches_ranked_by_popularity(self, db):
+        db.upsert_product(make_product(product_id="tagged", tags=("fly fishing",)))
+        db.upsert_product(make_product(product_id="titled", title="Fly Fishing Vest", tags=()))
+        with db.get_db_connection() as conn:
+            conn.execute("UPDATE products SET popularity_score = 5 WHERE product_id = 'titled'")
+        ids = [r["product_id"] for r in db.search_products_by_interests(["fly fishing"])]
+        assert ids == ["titled", "tagged"]
+
+    def test_interest_index_table_dropped(self, db):
+        with db.get_db_connection() as conn:
+            names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        assert not any("product_interests" in n for n in names)
+
+
+# ---------------------------------------------------------------------------
+# Profile cache
+# ---------------------------------------------------------------------------
+
+class TestProfileCache:
+    def test_profile_hash_is_pinned(self, db):
+        # Fixed value: a change here re-keys every cached profile
+        assert db.hash_profile(b"h1") == "bd7651749960657cdd37e49c4b1cdf9a"
+
+    def test_repeat_lookup_served_from_memory(self, db):
+        db.cache_profile(H1, '{"interests": ["yoga"]}')
+        assert db.get_cached_profile(H1) == {"interests": ["yoga"]}
+
+        with db.get_db_connection() as conn:
+            conn.execute("DELETE FROM cached_profiles")
+        assert db.get_cached_profile(H1) == {"interests": ["yoga"]}
+
+    def test_recache_invalidates_memory_entry(self, db):
+        db.cache_profile(H1, '{"v": 1}')
+        db.get_cached_profile(H1)
+        db.cache_profile(H1, '{"v": 2}')
+        assert db.get_cached_profile(H1) == {"v": 2}
+
+    def test_legacy_text_row_still_readable(self, db):
+        with db.get_db_connection() as conn:
+            conn.execute(
+                "INSERT INTO cached_profiles (profile_hash, profile_json, expires_at) "
+                "VALUES (?, '{\"v\": 1}', '2999-01-01T00:00:00')",
+                (bytes.fromhex(OLD),),
+            )
+        assert db.get_cached_profile(OLD) == {"v": 1}
+
+    def test_profile_stored_compressed(self, db):
+        pytest.importorskip("zstandard")
+        db.cache_profile(H1, '{"interests": ["yoga"]}')
+        with db.get_db_connection() as conn:
+            row = conn.execute(
+                "SELECT profile_json, profile_blob, typeof(profile_hash) AS key_type, "
+                "length(profile_hash) AS key_len FROM cached_profiles"
+            ).fetchone()
+        assert row["profile_json"] == ""
+        assert row["profile_blob"] is not None
+        assert (row["key_type"], row["key_len"]) == ("blob", db.PROFILE_HASH_BYTES)
+
+    def test_clean_expired_profiles_in_batches(self, db, monkeypatch):
+        monkeypatch.setattr(database, "CLEAN_BATCH_SIZE", 2)
+        with db.get_db_connection() as conn:
+            conn.executemany(
+                "INSERT INTO cached_profiles (profile_hash, profile_json, expires_at) VALUES (?, '{}', ?)",
+                [(f"old{i}", "2000-01-01T00:00:00") for i in range(5)] + [("live", "2999-01-01T00:00:00")],
+            )
+        assert db.clean_expired_profiles() == 5
+        with db.get_db_connection() as conn:
+            left = [r[0] for r in conn.execute("SELECT profile_hash FROM cached_profiles")]
+        assert left == ["live"]
+
+    def test_access_count_flushed_in_bulk(self, db):
+        db.cache_profile(H1, '{}')
+        db.get_cached_profile(H1)
+        db.get_cached_profile(H1)
+        db.flush_tracked_events()
+        with db.get_db_connection() as conn:
+            count = conn.execute(
+                "SELECT access_count FROM cached_profiles WHERE profile_hash = ?", (bytes.fromhex(H1),)
+            ).fetchone()[0]
+        assert count == 2
+
+
+# ---------------------------------------------------------------------------
+# Interest intelligence
+# ---------------------------------------------------------------------------
+
+class TestInterestIntelligence:
+    def test_lookup_cached_until_write(self, db):
+        db.upsert_interest_intelligence("Zither", {"do_buy": ["zither strings"]})
+        assert db.get_interest_intelligence("zither")["do_buy"] == ["zither strings"]
+
+        with db.get_db_connection() as conn:
+            conn.execute("DELETE FROM interest_intelligence WHERE interest_name = 'zither'")
+        assert db.get_interest_intelligence("zither")["do_buy"] == ["zither strings"]
+
+        db.increment_interest_seen("zither")
+        assert db.get_interest_intelligence("zither")["do_buy"] is None
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+class TestMaintenance:
+    def test_full_pass_runs_once_per_interval(self, db):
+        assert db.run_maintenance() is True
+        assert db.run_maintenance() is False
+        assert db.run_maintenance(full=True) is True
+
+    def test_due_check_skips_vacuum_within_interval(self, db):
+        db.run_maintenance(full=True)
+        statements = []
+        with db.get_db_connection(transaction=False) as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                assert db.run_maintenance(full=None) is False
+                assert db.run_maintenance(full=False) is False
+            finally:
+                conn.set_trace_callback(None)
+        assert "PRAGMA optimize" in statements
+        assert not any(s.startswith(("VACUUM", "ANALYZE")) for s in statements)
+
+
+# ---------------------------------------------------------------------------
+# Intelligence tracking
+# ---------------------------------------------------------------------------
+
+class TestEventTracking:
+    def test_events_are_buffered_until_flush(self, db):
+        db.track_product_recommended("p1", "shop")
+        db.track_product_recommended("p1", "shop")
+        db.track_product_clicked("p1", "shop")
+        assert db.get_product_intelligence("p1", "shop") is None
+
+        assert db.flush_tracked_events() == 2
+        intel = db.get_product_intelligence("p1", "shop")
+        assert intel["times_recommended"] == 2
+        assert intel["times_clicked"] == 1
+        assert intel["click_through_rate"] == 0.5
+
+    def test_flush_if_due_waits_for_interval(self, db, monkeypatch):
+        db.track_product_clicked("p1", "shop")
+        assert db.flush_tracked_events_if_due() == 0
+        monkeypatch.setattr(database, "EVENT_FLUSH_INTERVAL", 0)
+        assert db.flush_tracked_events_if_due() == 1
+
+    def test_popularity_flushes_to_products(self, db):
+        db.upsert_product(make_product("p1", retailer="shop", tags=["yoga"]))
+        db.increment_popularity("p1", "shop")
+        db.increment_popularity("p1", "shop")
+        db.flush_tracked_events()
+        assert db.search_products_by_interests(["yoga"])[0]["popularity_score"] == 2
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class TestRateLimit:
+    def test_second_run_within_window_is_blocked(self, db):
+        assert db.check_and_record_pipeline_run("1.2.3.4") == (True, None)
+        allowed, reset_time = db.check_and_record_pipeline_run("1.2.3.4")
+        assert not allowed
+        assert reset_time is not None
+
+    def test_run_allowed_after_window(self, db):
+        db.check_and_record_pipeline_run("1.2.3.4")
+        with db.get_db_connection() as conn:
+            conn.execute("UPDATE rate_limits SET last_run = '2020-01-01T00:00:00'")
+        assert db.check_and_record_pipeline_run("1.2.3.4") == (True, None)